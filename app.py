@@ -8,24 +8,38 @@ from components.results_display import display_results
 
 from services.init import Init
 from services.query import QueryService
+from services.sessions import SESSIONS, Session
+from core.tracing import start_metrics_server
 
 st.set_page_config(page_title="Dataset Analyzer", layout="wide")
 st.title("📊 Dataset Analyzer")
 
 
-if "init" not in st.session_state:
-    st.session_state["init"] = Init()
-init: Init = st.session_state["init"]
+# Per-session state; datasets are shared read-only between sessions (see services/sessions.py)
+session: Session = SESSIONS.get(st.session_state.get("session_id"))
+st.session_state["session_id"] = session.id
+init: Init = session.init
+init.start_warmup()
+start_metrics_server()  # no-op unless METRICS_PORT is set
 
 st.sidebar.header("Step 1: Upload Dataset")
 uploaded_name = upload_dataset()
 if uploaded_name:
-    df = init.load_dataset(uploaded_name)
+    session.open_dataset(uploaded_name)
     st.session_state["current_dataset"] = uploaded_name
-    st.session_state["df"] = df
 current_dataset = st.session_state.get("current_dataset", None)
-df = st.session_state.get("df", None)
+if current_dataset and session.dataset != current_dataset:
+    # The session was closed while idle; reattach its dataset from the shared cache
+    session.open_dataset(current_dataset)
 
+st.sidebar.header("Step 2: Preview Dataset")
+if current_dataset and session.dataset == current_dataset:
+    display_dataset_head(current_dataset, n=5)
+    display_dataset_description(current_dataset)
+else:
+    st.info("Upload a dataset to preview it here.")
+
+# The preview above never waits for the models; they keep loading in the warm-up thread
 if current_dataset and not init.agent.is_ready():
     with st.spinner("Initializing AI components ..."):
         try:
@@ -35,20 +49,13 @@ if current_dataset and not init.agent.is_ready():
             st.error("AI initialization failed: "+str(e))
             st.stop()
 
-st.sidebar.header("Step 2: Preview Dataset")
-if current_dataset and df is not None:
-    display_dataset_head(current_dataset, n=5)
-    display_dataset_description(current_dataset)
-else:
-    st.info("Upload a dataset to preview it here.")
-
 st.sidebar.header("Step 3: Ask a Question")
 if current_dataset:
-    q = QueryService(init)
+    q = QueryService(session)
     query_interface(current_dataset, q.handle_query)
 
 st.sidebar.header("Step 4: Query Result")
 if "last_answer" in st.session_state:
     answer_text = st.session_state["last_answer"]
     figs = st.session_state.get("last_figs", [])
-    display_results(answer_text, figs)
\ No newline at end of file
+    display_results(answer_text, figs, st.session_state.get("last_trace"))
\ No newline at end of file
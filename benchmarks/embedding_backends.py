@@ -0,0 +1,97 @@
+"""
+Compare the embedding backends on a fixed corpus of column descriptions.
+
+The corpus is the column documents IndexManager builds for a synthetic dataset, so
+the texts have the same shape and length as in production. For every backend the
+script reports load time, throughput and how closely its vectors agree with the
+plain torch backend (cosine similarity, 1.0 = identical).
+
+    python benchmarks/embedding_backends.py [--columns 200] [--repeat 3] [--batch-size 32]
+                                            [--backends torch torch-int8 onnx onnx-int8] [--json out.json]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from config import EMBEDDING_MODEL_NAME, MODEL_DIR, NB_THREADS  # noqa: E402
+from core.embeddings import BACKENDS, SentenceTransformerEmbedding  # noqa: E402
+from core.managers.index_manager import IndexManager  # noqa: E402
+
+
+def make_corpus(n_columns: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(n_columns):
+        kind = i % 4
+        if kind == 0:
+            data[f"sensor_{i}_reading"] = rng.normal(size=500)
+        elif kind == 1:
+            data[f"count_{i}"] = rng.integers(0, 1000, size=500)
+        elif kind == 2:
+            data[f"category_{i}"] = rng.choice(["north", "south", "east", "west"], size=500)
+        else:
+            data[f"event_date_{i}"] = pd.date_range("2024-01-01", periods=500, freq="h")
+    docs = IndexManager()._df_to_documents(pd.DataFrame(data))
+    return [d.text for d in docs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument("--json", type=Path)
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.columns)
+    print(f"{len(corpus)} documents, model {EMBEDDING_MODEL_NAME}, {NB_THREADS} threads")
+
+    results, reference = [], None
+    for backend in args.backends:
+        try:
+            start = time.perf_counter()
+            model = SentenceTransformerEmbedding(
+                EMBEDDING_MODEL_NAME, backend=backend, batch_size=args.batch_size,
+                threads=NB_THREADS, model_dir=MODEL_DIR,
+            )
+            load = time.perf_counter() - start
+        except Exception as e:
+            print(f"{backend:<12} unavailable: {e}")
+            continue
+
+        model.get_text_embedding_batch(corpus[: args.batch_size])  # warm-up
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            vectors = np.asarray(model.get_text_embedding_batch(corpus), dtype=np.float32)
+            timings.append(time.perf_counter() - start)
+
+        if reference is None and backend == "torch":
+            reference = vectors
+        agreement = float(np.min(np.sum(vectors * reference, axis=1))) if reference is not None else None
+        best = min(timings)
+        results.append({
+            "backend": backend,
+            "load_seconds": load,
+            "embed_seconds": best,
+            "docs_per_second": len(corpus) / best,
+            "min_cosine_vs_torch": agreement,
+        })
+        agree = f"{agreement:.4f}" if agreement is not None else "-"
+        print(f"{backend:<12} load {load:6.2f}s  embed {best:6.3f}s  {len(corpus) / best:8.1f} docs/s  min cos {agree}")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
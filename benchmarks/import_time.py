@@ -0,0 +1,79 @@
+"""
+Cold import time of the modules the app loads before its first page paints.
+
+Each module is imported in a fresh interpreter, so timings include every transitive
+import. The report also lists which heavy libraries ended up loaded; none of them
+should appear until a question is asked.
+
+    python benchmarks/import_time.py [--repeat 3] [--json out.json] [--max-seconds 5]
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = [
+    "config",
+    "core.managers.dataset_manager",
+    "components.data_viewer",
+    "core.agent.agent",
+    "services.init",
+]
+
+HEAVY = ["torch", "sentence_transformers", "transformers", "llama_index.core", "chromadb", "seaborn", "openai"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            return {"module": module, "error": out.stderr.strip().splitlines()[-1:]}
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "seconds": min(r["seconds"] for r in runs),
+        "loaded": runs[-1]["loaded"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module; the fastest is kept")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    parser.add_argument("--max-seconds", type=float, help="exit with status 1 if any module is slower")
+    args = parser.parse_args()
+
+    results = [measure(m, args.repeat) for m in MODULES]
+    failed = False
+    for r in results:
+        if "error" in r:
+            print(f"{r['module']:<35} ERROR {r['error']}")
+            failed = True
+            continue
+        heavy = ", ".join(r["loaded"]) or "-"
+        print(f"{r['module']:<35} {r['seconds']:7.3f}s   heavy: {heavy}")
+        if args.max_seconds is not None and r["seconds"] > args.max_seconds:
+            failed = True
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
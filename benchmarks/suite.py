@@ -0,0 +1,428 @@
+"""
+Performance suite for the data path: ingestion, profiling, compute strategies, index
+build, retrieval and chart rendering, on synthetic datasets of configurable shape.
+
+Datasets mix float (with missing values), integer, categorical, boolean and date
+columns and are generated from a fixed seed, so every run measures the same data.
+Generated files are kept in --workdir and reused by later runs. Each case reports the
+best of --repeat runs (plus the median); caches are cleared before "cold" runs.
+
+The suite runs offline: the index uses llama_index's MockEmbedding (unless
+--real-embeddings) and the retriever's synthesize mode answers with MockLLM. Vector
+stores are written under the work directory, never into the project's embeddings.
+
+    python benchmarks/suite.py [--preset quick|standard|full] [--rows 10000 ...] [--cols 10 ...]
+                               [--formats csv parquet json xlsx] [--groups load strategies ...]
+                               [--repeat 3] [--json results.json]
+                               [--baseline baseline.json] [--tolerance 0.25] [--save-baseline baseline.json]
+
+With --baseline, each case is compared to the stored timing and the script exits with
+status 1 when one is slower by more than the tolerance (and by more than --min-delta
+seconds, so sub-millisecond noise never fails the check).
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+WORKDIR = Path(os.getenv("BENCH_WORKDIR", str(Path(tempfile.gettempdir()) / "ka7lanzi-bench")))
+# Keep the benchmark's vector stores and embedding cache out of the project directory
+os.environ.setdefault("EMBEDDINGS_PATH", str(WORKDIR / "embeddings"))
+os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+
+from core.executor.correlation_engine import CORRELATION_ENGINE  # noqa: E402
+from core.executor.sql_source import DuckDBSource  # noqa: E402
+from core.executor.strategies.base import ComputeStrategy  # noqa: E402
+from core.executor.strategies.correlation import CorrelationStrategy  # noqa: E402
+from core.executor.strategies.describe import DescribeStrategy  # noqa: E402
+from core.executor.strategies.filter import FilterStrategy  # noqa: E402
+from core.executor.strategies.groupby import GroupByStrategy  # noqa: E402
+from core.executor.strategies.timeseries import TimeSeriesAggregateStrategy  # noqa: E402
+from core.executor.strategies.topk import TopKStrategy  # noqa: E402
+from core.managers.dataset_cache import DATASET_CACHE  # noqa: E402
+from core.managers.dataset_manager import DatasetManager  # noqa: E402
+from core.managers.ingestion import columnar_path  # noqa: E402
+from core.managers.profile import PROFILE_CACHE, DatasetProfile  # noqa: E402
+
+PRESETS = {
+    "quick": ([10_000, 100_000], [10, 100]),
+    "standard": ([10_000, 1_000_000], [10, 100, 1000]),
+    "full": ([10_000, 1_000_000, 10_000_000], [10, 100, 1000]),
+}
+GROUPS = ["load", "profile", "strategies", "index", "retrieve", "charts"]
+FORMATS = ["csv", "parquet", "json", "xlsx"]
+# Text formats are slow to write and parse; larger datasets only use csv and parquet
+SLOW_FORMAT_MAX_CELLS = {"json": 5_000_000, "xlsx": 1_000_000}
+EXCEL_MAX_ROWS, EXCEL_MAX_COLS = 1_048_575, 16_384
+
+QUESTIONS = [
+    "What is the average value per category?",
+    "Which columns are correlated with value?",
+    "How does value evolve over time?",
+    "Which rows have the largest count?",
+    "How many missing values are there?",
+]
+CATEGORIES = ["north", "south", "east", "west", "central", "online", "retail", "wholesale"]
+
+
+def make_dataset(rows: int, cols: int, seed: int = 0) -> pd.DataFrame:
+    """
+    `rows` x `cols` frame whose first columns are date, category, value and count;
+    the remaining columns cycle through float, int, category, bool and date.
+    """
+    rng = np.random.default_rng(seed)
+    data: Dict[str, Any] = {
+        "date": pd.date_range("2020-01-01", periods=rows, freq="min"),
+        "category": rng.choice(CATEGORIES, size=rows),
+        "value": rng.normal(100.0, 15.0, size=rows),
+        "count": rng.integers(0, 10_000, size=rows),
+    }
+    for i in range(len(data), max(cols, len(data))):
+        kind = i % 5
+        if kind == 0:
+            column = rng.normal(size=rows)
+            column[rng.random(rows) < 0.01] = np.nan
+            data[f"metric_{i}"] = column
+        elif kind == 1:
+            data[f"amount_{i}"] = rng.integers(-1000, 1000, size=rows)
+        elif kind == 2:
+            data[f"segment_{i}"] = rng.choice(CATEGORIES[: 2 + i % 6], size=rows)
+        elif kind == 3:
+            data[f"flag_{i}"] = rng.random(rows) < 0.5
+        else:
+            data[f"event_{i}"] = pd.Timestamp("2021-01-01") + pd.to_timedelta(rng.integers(0, 86_400 * 365, size=rows), "s")
+    return pd.DataFrame(data)
+
+
+def format_allowed(fmt: str, rows: int, cols: int) -> bool:
+    if fmt == "xlsx" and (rows > EXCEL_MAX_ROWS or cols > EXCEL_MAX_COLS):
+        return False
+    return rows * cols <= SLOW_FORMAT_MAX_CELLS.get(fmt, float("inf"))
+
+
+def write_dataset(df: pd.DataFrame, path: Path):
+    """Write once; the temporary name keeps an interrupted run from leaving a partial file."""
+    if path.exists():
+        return
+    tmp = path.with_name(f".{path.name}.tmp{path.suffix}")
+    ext = path.suffix
+    if ext == ".csv":
+        df.to_csv(tmp, index=False)
+    elif ext == ".parquet":
+        df.to_parquet(tmp, index=False)
+    elif ext == ".json":
+        df.to_json(tmp, orient="records", date_format="iso")
+    elif ext == ".xlsx":
+        df.to_excel(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def timed(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    runs = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        out = fn()
+        runs.append(time.perf_counter() - start)
+        # Strategies and the retriever report failures as strings instead of raising
+        if isinstance(out, str) and out.startswith(("[ERROR]", "[Retriever")):
+            raise RuntimeError(out)
+    return {"seconds": min(runs), "median": statistics.median(runs), "runs": runs}
+
+
+class Suite:
+    def __init__(self, workdir: Path, repeat: int, real_embeddings: bool = False):
+        self.workdir = Path(workdir)
+        self.repeat = repeat
+        self.real_embeddings = real_embeddings
+        self.results: List[Dict[str, Any]] = []
+        (self.workdir / "data").mkdir(parents=True, exist_ok=True)
+
+    def record(self, name: str, rows: int, cols: int, fn: Callable[[], Any], setup: Optional[Callable[[], None]] = None,
+               repeat: Optional[int] = None, **extra):
+        entry: Dict[str, Any] = {"key": f"{name}@{rows}x{cols}", "name": name, "rows": rows, "cols": cols, **extra}
+        try:
+            entry.update(timed(fn, repeat or self.repeat, setup))
+            print(f"  {name:<34} {entry['seconds']:9.4f}s  (median {entry['median']:.4f}s)")
+        except Exception as e:
+            entry["error"] = str(e)[:500]
+            print(f"  {name:<34} FAILED: {entry['error'][:120]}")
+        self.results.append(entry)
+
+    @staticmethod
+    def clear_caches():
+        DATASET_CACHE.clear()
+        PROFILE_CACHE.clear()
+        CORRELATION_ENGINE.clear()
+
+    # -- groups -----------------------------------------------------------------
+
+    def bench_load(self, paths: Dict[str, Path], rows: int, cols: int):
+        for fmt, path in paths.items():
+            sidecar = columnar_path(path, DATASET_CACHE.fingerprint(path))
+
+            def cold(path=path, sidecar=sidecar):
+                self.clear_caches()
+                if sidecar != path:
+                    sidecar.unlink(missing_ok=True)
+
+            load = lambda path=path: DatasetManager().load(path)  # noqa: E731
+            # cold: parse the original and write the Parquet sidecar; warm: read the sidecar
+            self.record(f"load/{fmt}/cold", rows, cols, load, setup=cold, bytes=path.stat().st_size)
+            if sidecar != path:
+                self.record(f"load/{fmt}/warm", rows, cols, load, setup=self.clear_caches)
+        any_path = next(iter(paths.values()))
+        DatasetManager().load(any_path)
+        self.record("load/cached", rows, cols, lambda: DatasetManager().load(any_path))
+
+    def bench_profile(self, df: pd.DataFrame, rows: int, cols: int):
+        self.record("profile/build", rows, cols, lambda: DatasetProfile.from_frame(df))
+
+    def strategy_cases(self, df: pd.DataFrame) -> Dict[str, tuple]:
+        numeric = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+        return {
+            "describe": (DescribeStrategy(), {}),
+            "groupby": (GroupByStrategy(), {"by": "category", "agg": "mean", "target": "value"}),
+            "groupby_all": (GroupByStrategy(), {"by": "category", "agg": "mean"}),
+            "correlation_matrix": (CorrelationStrategy(), {"columns": numeric[:50]}),
+            "correlation_target": (CorrelationStrategy(), {"target": "value", "top_n": 5}),
+            "topk": (TopKStrategy(), {"column": "value", "k": 10}),
+            "filter": (FilterStrategy(), {"column": "value", "operator": ">", "value": 110.0}),
+            "timeseries": (TimeSeriesAggregateStrategy(), {"date_column": "date", "value_column": "value", "freq": "D"}),
+        }
+
+    def bench_strategies(self, df: pd.DataFrame, parquet: Optional[Path], rows: int, cols: int):
+        cases = self.strategy_cases(df)
+        covered = {type(strategy) for strategy, _ in cases.values()}
+        for cls in ComputeStrategy.__subclasses__():
+            if cls not in covered:
+                print(f"  [BENCH] no benchmark case for {cls.__name__}")
+
+        PROFILE_CACHE.get(df)  # strategies look the profile up; build it outside the timings
+        for name, (strategy, params) in cases.items():
+            self.record(f"strategy/pandas/{name}", rows, cols,
+                        lambda s=strategy, p=params: s.compute(df, p), setup=CORRELATION_ENGINE.clear)
+
+        if parquet is None:
+            return
+        try:
+            source = DuckDBSource(parquet)
+        except Exception as e:
+            print(f"  [BENCH] duckdb backend unavailable: {e}")
+            return
+        for name, (strategy, params) in cases.items():
+            if isinstance(strategy, CorrelationStrategy) and "target" in params:
+                continue  # same SQL as the matrix case, restricted to one row
+            self.record(f"strategy/duckdb/{name}", rows, cols, lambda s=strategy, p=params: s.compute_sql(source, p))
+
+    def embedding_model(self):
+        if self.real_embeddings:
+            from config import get_embedding_model
+            return get_embedding_model()
+        from llama_index.core.embeddings import MockEmbedding
+        return MockEmbedding(embed_dim=384)
+
+    def bench_index(self, df: pd.DataFrame, rows: int, cols: int, retrieve: bool) -> None:
+        from core.managers.index_manager import IndexManager, get_chroma_client
+        from core.retriever.retriever import Retriever
+
+        profile = PROFILE_CACHE.get(df)
+        model = self.embedding_model()
+        for backend in ("chroma", "numpy"):
+            name = f"bench_{rows}x{cols}"
+            manager = IndexManager(collection_name=name, embeddings_model=model, backend=backend)
+
+            def reset(name=name):
+                try:
+                    get_chroma_client().delete_collection(name)
+                except Exception:
+                    pass
+                (Path(os.environ["EMBEDDINGS_PATH"]) / "numpy" / f"{name}.npz").unlink(missing_ok=True)
+
+            build = lambda m=manager: m.build_index(df, profile, fingerprint=name)  # noqa: E731
+            # cold: every column document is embedded and written; warm: all are reused
+            self.record(f"index/{backend}/cold", rows, cols, build, setup=reset, documents=len(profile.columns) + 1)
+            self.record(f"index/{backend}/warm", rows, cols, build)
+            if not retrieve:
+                continue
+
+            retriever = Retriever(manager, mode="vector")
+            self.record(f"retrieve/{backend}/vector", rows, cols,
+                        lambda r=retriever: [r.retrieve(q) for q in QUESTIONS], questions=len(QUESTIONS))
+            if backend == "chroma":
+                from llama_index.core import Settings
+                from llama_index.core.llms import MockLLM
+                Settings.llm = MockLLM(max_tokens=32)  # no network: the synthesize step answers with filler
+                retriever = Retriever(manager, mode="synthesize")
+                self.record(f"retrieve/{backend}/synthesize", rows, cols,
+                            lambda r=retriever: [r.retrieve(q) for q in QUESTIONS], questions=len(QUESTIONS))
+
+    def chart_steps(self, df: pd.DataFrame) -> Dict[str, dict]:
+        numeric = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+        return {
+            "heatmap": {"columns": numeric[:20]},
+            "boxplot": {"column": "value", "by": "category"},
+            "scatter": {"x": "value", "y": "count"},
+            "histogram": {"column": "value"},
+            "barplot": {"x": "category", "y": "value"},
+            "lineplot": {"x": "date", "y": "value"},
+            "timeseries": {"date_column": "date", "value_column": "value", "freq": "D"},
+            "piechart": {"column": "category"},
+        }
+
+    def bench_charts(self, df: pd.DataFrame, rows: int, cols: int):
+        from core.visualizer.visualizer import Visualizer
+
+        visualizer = Visualizer()
+        PROFILE_CACHE.get(df)
+
+        def render(step):
+            fig = visualizer.render(df, step)
+            if fig is None:
+                raise RuntimeError(f"chart '{step['name']}' was not rendered")
+            return fig
+
+        for name, params in self.chart_steps(df).items():
+            self.record(f"chart/{name}", rows, cols, lambda s={"name": name, "params": params}: render(s))
+
+    def run_shape(self, rows: int, cols: int, formats: List[str], groups: List[str], seed: int):
+        print(f"\n== {rows:,} rows x {cols:,} columns")
+        start = time.perf_counter()
+        df = None
+        paths: Dict[str, Path] = {}
+        for fmt in formats:
+            if not format_allowed(fmt, rows, cols):
+                continue
+            path = self.workdir / "data" / f"d{rows}x{cols}s{seed}.{fmt}"
+            if not path.exists():
+                if df is None:
+                    df = make_dataset(rows, cols, seed)
+                try:
+                    write_dataset(df, path)
+                except Exception as e:
+                    print(f"  [BENCH] cannot write {fmt}: {e}")
+                    continue
+            paths[fmt] = path
+        print(f"  datasets ready in {time.perf_counter() - start:.1f}s")
+
+        if "load" in groups and paths:
+            self.bench_load(paths, rows, cols)
+
+        # The remaining groups run on the dataset as the app sees it after ingestion
+        self.clear_caches()
+        source = paths.get("parquet") or next(iter(paths.values()), None)
+        df = DatasetManager().load(source) if source is not None else make_dataset(rows, cols, seed)
+        if "profile" in groups:
+            self.bench_profile(df, rows, cols)
+        if "strategies" in groups:
+            self.bench_strategies(df, paths.get("parquet"), rows, cols)
+        if "index" in groups or "retrieve" in groups:
+            self.bench_index(df, rows, cols, retrieve="retrieve" in groups)
+        if "charts" in groups:
+            self.bench_charts(df, rows, cols)
+        self.clear_caches()
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float, min_delta: float) -> List[Dict[str, Any]]:
+    """Cases slower than the baseline by more than `tolerance` (a fraction) and `min_delta` seconds."""
+    previous = {r["key"]: r for r in baseline.get("results", []) if "seconds" in r}
+    regressions = []
+    print(f"\n== comparison with baseline (tolerance {tolerance:.0%}, min delta {min_delta}s)")
+    for r in results:
+        base = previous.get(r["key"])
+        if base is None or "seconds" not in r:
+            continue
+        ratio = r["seconds"] / base["seconds"] if base["seconds"] > 0 else float("inf")
+        regressed = ratio > 1 + tolerance and r["seconds"] - base["seconds"] > min_delta
+        mark = "REGRESSION" if regressed else ("faster" if ratio < 1 - tolerance else "")
+        print(f"  {r['key']:<50} {base['seconds']:9.4f}s -> {r['seconds']:9.4f}s  x{ratio:5.2f}  {mark}")
+        if regressed:
+            regressions.append({"key": r["key"], "baseline": base["seconds"], "seconds": r["seconds"], "ratio": ratio})
+    missing = sorted(set(previous) - {r["key"] for r in results if "seconds" in r})
+    if missing:
+        print(f"  {len(missing)} baseline case(s) not measured in this run")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=PRESETS, default="quick")
+    parser.add_argument("--rows", type=int, nargs="+", help="overrides the preset's row counts")
+    parser.add_argument("--cols", type=int, nargs="+", help="overrides the preset's column counts")
+    parser.add_argument("--max-cells", type=int, default=100_000_000, help="skip shapes larger than this")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workdir", type=Path, default=WORKDIR)
+    parser.add_argument("--real-embeddings", action="store_true", help="embed with the configured model instead of MockEmbedding")
+    parser.add_argument("--json", type=Path, help="write the results here")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous --json / --save-baseline output")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown as a fraction")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="ignore slowdowns smaller than this (seconds)")
+    parser.add_argument("--save-baseline", type=Path, help="write the results as the new baseline")
+    args = parser.parse_args()
+
+    rows_list, cols_list = PRESETS[args.preset]
+    rows_list, cols_list = args.rows or rows_list, args.cols or cols_list
+
+    suite = Suite(args.workdir, args.repeat, args.real_embeddings)
+    started = time.time()
+    for rows in rows_list:
+        for cols in cols_list:
+            if rows * cols > args.max_cells:
+                print(f"\n== {rows:,} x {cols:,} skipped (over --max-cells {args.max_cells:,})")
+                continue
+            suite.run_shape(rows, cols, args.formats, args.groups, args.seed)
+
+    report = {
+        "meta": {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+            "seconds": round(time.time() - started, 1),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "embeddings": "real" if args.real_embeddings else "mock",
+        },
+        "results": suite.results,
+    }
+    failed = [r["key"] for r in suite.results if "error" in r]
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(report, indent=2))
+
+    status = 0
+    if args.baseline:
+        regressions = compare(suite.results, json.loads(args.baseline.read_text()), args.tolerance, args.min_delta)
+        report["regressions"] = regressions
+        if args.json:
+            args.json.write_text(json.dumps(report, indent=2))
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            status = 1
+    if failed:
+        print(f"\n{len(failed)} case(s) failed: {', '.join(failed[:10])}")
+        status = 1
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
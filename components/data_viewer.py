@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
 from core.managers.dataset_manager import DatasetManager
-from core.preview import TOOLS 
+from core.preview import describe_dataset, show_head
 
 manager = DatasetManager()
 
@@ -20,7 +20,7 @@ def display_dataset_head(dataset_name: str, n: int = 5):
         st.warning("No dataset selected yet.")
         return
 
-    df_head = TOOLS["head"].fn(dataset_name=dataset_name, n=n)
+    df_head = show_head(dataset_name=dataset_name, n=n)
     df_head = _sanitize_for_streamlit(df_head)
 
     st.subheader(f"Preview")
@@ -34,7 +34,7 @@ def display_dataset_description(dataset_name: str):
         st.warning("No dataset selected yet.")
         return
 
-    df_desc = TOOLS["describe"].fn(dataset_name=dataset_name) 
+    df_desc = describe_dataset(dataset_name=dataset_name) 
     df_desc = _sanitize_for_streamlit(df_desc)
 
     st.subheader(f"Description")
@@ -27,6 +27,8 @@ def upload_dataset() -> str | None:
                 st.error("Failed to load dataset. Please check the file format.")
                 return None
             st.success(f"Dataset '{uploaded_file.name}' uploaded and loaded successfully with shape {df.shape}!")
+            if manager.memory_report is not None:
+                st.caption(f"Memory footprint: {manager.memory_report}")
         except Exception as e:
             st.error(f"Error loading dataset: {str(e)}")
             return None
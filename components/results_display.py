@@ -1,9 +1,23 @@
 import streamlit as st
 from matplotlib.figure import Figure
 import pandas as pd
-from typing import List
+from typing import List, Optional
+from config import SHOW_TIMINGS
+from core.tracing import Span
+from core.visualizer.renderer import RenderedFigure
 
-def display_results(answer_text: str, figs: List[Figure|pd.DataFrame]):
+def display_timings(trace: Span):
+    """Per-stage timing breakdown of one question (retrieval, LLM calls, actions, renders)."""
+    rows = pd.DataFrame(trace.breakdown())
+    # Attributes differ per stage; keep the columns that say where the time went
+    columns = [c for c in [
+        "stage", "ms", "share", "status", "cache_hit", "rows", "result_rows", "result_items", "result_bytes",
+        "prompt_tokens", "completion_tokens", "first_token_seconds", "waited_seconds", "queued_seconds", "error",
+    ] if c in rows.columns]
+    with st.expander(f"⏱️ Timing breakdown ({trace.duration:.2f}s)"):
+        st.dataframe(rows[columns], hide_index=True, width="stretch")
+
+def display_results(answer_text: str, figs: List[RenderedFigure|Figure|pd.DataFrame], trace: Optional[Span] = None):
     """Display the final answer text and associated figures."""
     if answer_text: 
         st.subheader("📝 Answer") 
@@ -12,9 +26,17 @@ def display_results(answer_text: str, figs: List[Figure|pd.DataFrame]):
     if figs:
         st.subheader("📊 Visualizations")
         for i, fig in enumerate(figs, 1):
-            if isinstance(fig, Figure):
+            if isinstance(fig, RenderedFigure):
+                if fig.format == "svg":
+                    st.image(fig.data.decode("utf-8"), width=700)
+                else:
+                    st.image(fig.data, width=700)
+            elif isinstance(fig, Figure):
                 st.pyplot(fig, clear_figure=True, width=700)
             elif isinstance(fig, pd.DataFrame):
                 st.dataframe(fig)
     else:
-        st.info("No visualizations generated for this query.")
\ No newline at end of file
+        st.info("No visualizations generated for this query.")
+
+    if SHOW_TIMINGS and trace is not None:
+        display_timings(trace)
\ No newline at end of file
@@ -1,8 +1,7 @@
 from pathlib import Path
+from threading import Lock
 import os
 from dotenv import load_dotenv
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
-from core.llm import LLM
 
 load_dotenv()
 
@@ -10,17 +9,94 @@ BASE_DIR = Path(__file__).parent
 DATA_DIR = BASE_DIR / "uploads"
 DATA_DIR.mkdir(exist_ok=True)
 ALLOWED_EXTENSIONS = {".csv", ".xlsx", ".json", ".parquet"}
+DATASET_CACHE_MAX_BYTES = int(os.getenv("DATASET_CACHE_MAX_MB", "4096")) * 1024 * 1024 # budget shared by all loaded datasets
+# Arrow copies of loaded datasets memory-mapped by every worker process, e.g. "/dev/shm/ka7lanzi"; "" disables
+SHARED_DATASET_DIR = os.getenv("SHARED_DATASET_DIR", "")
+SHARED_DATASET_MAX_BYTES = int(os.getenv("SHARED_DATASET_MAX_MB", "8192")) * 1024 * 1024
+SESSION_IDLE_SECONDS = int(os.getenv("SESSION_IDLE_SECONDS", "3600")) # idle sessions release their dataset
+CSV_INGEST_MODE = os.getenv("CSV_INGEST_MODE", "optimized") # "optimized" (chunked, compact dtypes) or "plain"
+CSV_CHUNK_SIZE = int(os.getenv("CSV_CHUNK_SIZE", "250000"))
+COMPUTE_BACKEND = os.getenv("COMPUTE_BACKEND", "pandas") # "pandas" or "duckdb"
+DUCKDB_MEMORY_LIMIT = os.getenv("DUCKDB_MEMORY_LIMIT") # e.g. "4GB"; duckdb spills to disk beyond it
+EXECUTOR_MAX_WORKERS = int(os.getenv("EXECUTOR_MAX_WORKERS", str(min(8, os.cpu_count() or 1)))) # plan actions run concurrently
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_MB", "256")) * 1024 * 1024
+RENDER_MAX_WORKERS = int(os.getenv("RENDER_MAX_WORKERS", "2"))
+RENDER_MAX_IN_FLIGHT = int(os.getenv("RENDER_MAX_IN_FLIGHT", "8")) # renders queued or running at once
+RENDER_FORMAT = os.getenv("RENDER_FORMAT", "png") # "png" or "svg"
+RENDER_DPI = int(os.getenv("RENDER_DPI", "100"))
+# Size-aware plotting thresholds (0 disables the large-data path)
+VIZ_LINE_MAX_POINTS = int(os.getenv("VIZ_LINE_MAX_POINTS", "2000")) # LTTB downsampling above this
+VIZ_SCATTER_HEXBIN_ROWS = int(os.getenv("VIZ_SCATTER_HEXBIN_ROWS", "50000")) # binned density above this
+VIZ_BOXPLOT_RAW_ROWS = int(os.getenv("VIZ_BOXPLOT_RAW_ROWS", "100000")) # quantile-based boxes above this
 
 MODEL_DIR = BASE_DIR / "models"
 MODEL_DIR.mkdir(exist_ok=True)
 MODEL_PATH = MODEL_DIR / os.getenv("HF_MODEL_NAME", "qwen2.5-7b-instruct-q3_k_m.gguf")
-LLMODEL = LLM()
 
 NB_THREADS = 8
 NB_GPU_LAYERS = 1 # 0 for CPU only, 1 couche sur GPU
 
 EMBEDDING_MODEL_NAME = str(os.getenv("EMBEDDING_MODEL_NAME", "BAAI/bge-base-en-v1.5"))
-EMBEDDING_MODEL = HuggingFaceEmbedding(model_name=EMBEDDING_MODEL_NAME) # téléchargé une fois puis stocké dans ~/.cache/huggingface
-EMBEDDINGS_PATH = BASE_DIR / "embeddings"
+EMBEDDINGS_PATH = Path(os.getenv("EMBEDDINGS_PATH", str(BASE_DIR / "embeddings")))
+# A CPU backend, "torch", "torch-int8", "onnx" or "onnx-int8", all cached in EMBEDDING_CACHE_PATH,
+# or "hf" (llama_index HuggingFaceEmbedding, uncached)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_ONNX_QUANTIZATION = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx512_vnni") # or "avx2", "arm64"
+# Prefix added to queries only; English bge models expect the one HuggingFaceEmbedding adds on its own
+BGE_QUERY_INSTRUCTION = "Represent this question for searching relevant passages: "
+EMBEDDING_QUERY_INSTRUCTION = os.getenv(
+    "EMBEDDING_QUERY_INSTRUCTION",
+    BGE_QUERY_INSTRUCTION if EMBEDDING_MODEL_NAME.startswith("BAAI/bge-") and "-en" in EMBEDDING_MODEL_NAME else None,
+)
+INDEX_BACKEND = os.getenv("INDEX_BACKEND", "chroma") # "chroma" or "numpy" (in-process cosine index)
+RETRIEVER_MODE = os.getenv("RETRIEVER_MODE", "vector") # "vector" (top-k documents) or "synthesize" (LLM answer)
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", str(EMBEDDINGS_PATH / "vectors.sqlite")) # "" disables
 
-FEEDBACKS_PATH = BASE_DIR / "feedback/feedback.jsonl"
\ No newline at end of file
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "1") == "1"
+PLAN_CACHE_THRESHOLD = float(os.getenv("PLAN_CACHE_THRESHOLD", "0.95")) # cosine similarity needed to reuse a plan
+PLAN_CACHE_MAX_ENTRIES = 256 # per column schema
+PLAN_STREAMING = os.getenv("PLAN_STREAMING", "1") == "1" # execute actions while the plan is still streaming
+
+FEEDBACKS_PATH = BASE_DIR / "feedback/feedback.jsonl"
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1" # per-stage spans and metrics (core/tracing.py)
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "") # finished traces appended as JSONL, e.g. "traces/traces.jsonl"
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) # standalone Prometheus /metrics endpoint for the app; 0 disables
+SHOW_TIMINGS = os.getenv("SHOW_TIMINGS", "1") == "1" # timing breakdown panel under each answer
+
+API_MAX_WORKERS = int(os.getenv("API_MAX_WORKERS", str(min(8, os.cpu_count() or 1)))) # questions answered at once
+API_QUEUE_SIZE = int(os.getenv("API_QUEUE_SIZE", "32")) # waiting questions before new ones get a 429
+API_MAX_UPLOAD_MB = int(os.getenv("API_MAX_UPLOAD_MB", "2048"))
+API_MAX_AGENTS = int(os.getenv("API_MAX_AGENTS", "32")) # per-dataset agents kept in memory
+
+# Heavy components (openai client, torch embedding model) are built on first use, not at import
+_embedding_model = None
+_embedding_lock = Lock()
+
+def get_llm():
+    from core.llm import LLM
+    return LLM()
+
+def get_embedding_model():
+    global _embedding_model
+    if _embedding_model is None:
+        with _embedding_lock:
+            if _embedding_model is None:
+                # téléchargé une fois puis stocké dans ~/.cache/huggingface
+                if EMBEDDING_BACKEND == "hf":
+                    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+                    _embedding_model = HuggingFaceEmbedding(model_name=EMBEDDING_MODEL_NAME)
+                else:
+                    from core.embeddings import EmbeddingCache, SentenceTransformerEmbedding
+                    _embedding_model = SentenceTransformerEmbedding(
+                        EMBEDDING_MODEL_NAME,
+                        backend=EMBEDDING_BACKEND,
+                        batch_size=EMBEDDING_BATCH_SIZE,
+                        threads=NB_THREADS,
+                        cache=EmbeddingCache(EMBEDDING_CACHE_PATH) if EMBEDDING_CACHE_PATH else None,
+                        query_instruction=EMBEDDING_QUERY_INSTRUCTION,
+                        onnx_quantization=EMBEDDING_ONNX_QUANTIZATION,
+                        model_dir=MODEL_DIR,
+                    )
+    return _embedding_model
\ No newline at end of file
@@ -0,0 +1 @@
+# Makes the repository root importable when running `pytest` from it
@@ -1,6 +1,6 @@
+from threading import Lock
 from typing import Optional, List, Dict, Any
 import pandas as pd
-from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 
 from core.managers.dataset_manager import DatasetManager
 from core.managers.index_manager import IndexManager
@@ -8,6 +8,7 @@ from core.retriever.retriever import Retriever
 
 from core.interfaces.iplanner import IPlanner
 from core.executor.executor import Executor
+from core.executor.sql_source import DuckDBSource
 from core.interfaces.ivisualizer import IVisualizer
 
 from core.executor.strategies.correlation import CorrelationStrategy
@@ -18,17 +19,21 @@ from core.executor.strategies.filter import FilterStrategy
 from core.executor.strategies.timeseries import TimeSeriesAggregateStrategy
 
 from core.llm import LLM
-from config import EMBEDDING_MODEL, DATA_DIR, LLMODEL
+from core.tracing import TRACER, Span
+from config import DATA_DIR, COMPUTE_BACKEND, DUCKDB_MEMORY_LIMIT, PLAN_STREAMING
 
 
 class WorkflowAgent:
     def __init__(
         self,
     ):
-        self.dataset_manager = DatasetManager()
+        self.dataset_manager = DatasetManager(pin=True)
         self.index_manager: Optional[IndexManager] = None
         self.llm: Optional[LLM] = None
-        self.embeddings_model: Optional[HuggingFaceEmbedding] = None
+        self.embeddings_model: Any = None
+        self._sql_source: Optional[DuckDBSource] = None
+        self._sql_source_fingerprint: Optional[str] = None
+        self._index_lock = Lock()
         
         self._init_started = False
         self._init_finished = False
@@ -39,14 +44,18 @@ class WorkflowAgent:
             planner: IPlanner,
             executor: Executor,  
             visualizer: IVisualizer,
-            embeddings_model: HuggingFaceEmbedding = EMBEDDING_MODEL, 
-            llm_client: LLM = LLMODEL,
+            embeddings_model: Any = None,
+            llm_client: Optional[LLM] = None,
         ):
-        """Initialisation asynchrone des composants lourds"""
+        """
+        Initialisation asynchrone des composants lourds. Models left as None are
+        resolved lazily on first use (see config.get_llm / get_embedding_model).
+        """
         try:
             self._init_started = True
 
             self.index_manager = IndexManager(embeddings_model=embeddings_model)
+            self.embeddings_model = embeddings_model
             self.llm = llm_client
 
             self.retriever: Retriever = Retriever(index_manager=self.index_manager)
@@ -64,18 +73,62 @@ class WorkflowAgent:
         return self._init_finished and self._init_error is None
 
     def load_dataset(self, current_dataset_name: str):
+        """
+        Open a dataset. With the duckdb backend it is only converted and profiled by
+        DuckDB, and the returned frame is None: pandas loads it on demand for the actions
+        the SQL path does not cover.
+        """
         path = DATA_DIR / current_dataset_name
+        if COMPUTE_BACKEND == "duckdb":
+            try:
+                source = self.dataset_manager.attach(path, memory_limit=DUCKDB_MEMORY_LIMIT)
+                self._set_sql_source(source)
+                return self.dataset_manager.df
+            except Exception as e:
+                print(f"[AGENT] duckdb backend unavailable, using pandas: {e}")
         df = self.dataset_manager.load(path)
         self.dataset_manager.df = df
         return df
 
+    def close(self):
+        """Release the current dataset so the shared cache may evict it."""
+        self._set_sql_source(None)
+        self.dataset_manager.release()
+
+    def _set_sql_source(self, source: Optional[DuckDBSource]):
+        old = self._sql_source
+        self._sql_source = source
+        self._sql_source_fingerprint = self.dataset_manager.fingerprint
+        if old is not None and old is not source:
+            old.close()
+
+    def sql_source(self) -> Optional[DuckDBSource]:
+        """DuckDB view over the current dataset's columnar file when COMPUTE_BACKEND is 'duckdb'."""
+        if COMPUTE_BACKEND != "duckdb" or self.dataset_manager.path is None:
+            return None
+        if self._sql_source is None or self._sql_source_fingerprint != self.dataset_manager.fingerprint:
+            try:
+                path = self.dataset_manager.ingest(self.dataset_manager.path, self.dataset_manager.fingerprint)
+                self._set_sql_source(DuckDBSource(path, memory_limit=DUCKDB_MEMORY_LIMIT))
+            except Exception as e:
+                print(f"[AGENT] duckdb backend unavailable, using pandas: {e}")
+                self._set_sql_source(None)
+        return self._sql_source
+
     def build_index(self):
-        df = self.dataset_manager.df
-        if df is None:
+        profile = self.dataset_manager.profile
+        if profile is None:
             raise ValueError("No dataset loaded")
         if self.index_manager is None:
             raise RuntimeError("IndexManager not initialized")
-        self.index_manager.build_index(df)
+        self.index_manager.build_index(self.dataset_manager.df, profile, self.dataset_manager.fingerprint)
+
+    def ensure_index(self):
+        """Build (or reopen) the column index of the current dataset unless it is already open."""
+        with self._index_lock:
+            if self.index_manager.index is None or self.index_manager.fingerprint != self.dataset_manager.fingerprint:
+                with TRACER.span("index"):
+                    self.build_index()
 
     def format_results(self, results: List[Dict[str, Any]]):
         answer_texts = [] 
@@ -101,38 +154,99 @@ class WorkflowAgent:
                 answer_texts.append(res["message"]) 
         return { "answer": "\n\n".join(answer_texts).strip(), "figs": figs }
 
+    def _make_executor(self) -> Executor:
+        strategies = {
+            "describe": DescribeStrategy(),
+            "groupby": GroupByStrategy(),
+            "correlation": CorrelationStrategy(),
+            "topk": TopKStrategy(),
+            "filter": FilterStrategy(),
+            "timeseries": TimeSeriesAggregateStrategy(),
+        }
+        # The planner prompt names this action timeseries_aggregate
+        strategies["timeseries_aggregate"] = strategies["timeseries"]
+        return self.executor(
+            self.dataset_manager.df, strategies, self.visualizer,
+            load_frame=self.dataset_manager.frame,
+            source=self.sql_source(),
+            fingerprint=self.dataset_manager.fingerprint,
+        )
+
     def ask(self, question: str):
+        """
+        Answer `question` on the current dataset. The result carries the question's
+        trace (a Span, or None when tracing is disabled) under "trace".
+        """
+        profile = self.dataset_manager.profile
+        with TRACER.span("ask", dataset_rows=profile.n_rows if profile is not None else 0) as span:
+            result = self._ask(question)
+        result["trace"] = span if isinstance(span, Span) else None
+        return result
+
+    def _ask(self, question: str):
         if not self._init_finished:
             raise RuntimeError("Agent is not initialized.")
         
-        df = self.dataset_manager.df
-        if df is None:
+        if self.dataset_manager.profile is None:
             raise ValueError("No dataset loaded.")
 
+        try:
+            self.ensure_index()
+        except Exception as e:
+            # Planning still works without retrieved context
+            print(f"[AGENT] index unavailable: {e}")
+
         try:
             context = self.retriever.retrieve(question)
         except Exception as e:
             context = None
             raise RuntimeError(f"Failed to retrieve context from the question: {e}") from e
 
+        if PLAN_STREAMING:
+            # Actions are executed as soon as the planner streams them out
+            try:
+                actions = self.planner.plan_stream(
+                    question, self.dataset_manager.basic_stats_text(), self.dataset_manager.columns, context=context
+                )
+                exec_results = self._make_executor().execute_stream(actions)
+                return self.format_results(exec_results)
+            except Exception as e:
+                raise RuntimeError(f"Error planning or executing the streamed plan: {e}") from e
+
+        return self.run_plan(self._plan(question, context))
+
+    def _plan(self, question: str, context: Optional[str]) -> Dict[str, Any]:
         try:
-            plan = self.planner.plan(question, self.dataset_manager.basic_stats_text(), list(df.columns), context=context)
+            plan = self.planner.plan(
+                question, self.dataset_manager.basic_stats_text(), self.dataset_manager.columns, context=context
+            )
             if not plan or not isinstance(plan, dict):
                 raise ValueError("Planner returned an invalid or empty plan.")
         except Exception as e:
             raise RuntimeError(f"Failed to generate a plan from the question: {e}") from e
+        return plan
 
-        try:
-            strategies = {
-                "describe": DescribeStrategy(),
-                "groupby": GroupByStrategy(),
-                "correlation": CorrelationStrategy(),
-                "topk": TopKStrategy(),
-                "filter": FilterStrategy(),
-                "timeseries": TimeSeriesAggregateStrategy()
-            }
-            executor: Executor = self.executor(df, strategies, self.visualizer)
-            exec_results = executor.execute(plan)
-            return self.format_results(exec_results)
-        except Exception as e:
-            raise RuntimeError(f"Error executing the plan: {e}") from e
+    def prepare(self, question: str) -> Dict[str, Any]:
+        """
+        Retrieval and planning for one question, without executing anything. Safe to call
+        from several threads once the index is built (see `ensure_index`).
+        """
+        if not self._init_finished:
+            raise RuntimeError("Agent is not initialized.")
+        if self.dataset_manager.profile is None:
+            raise ValueError("No dataset loaded.")
+        with TRACER.span("prepare"):
+            try:
+                context = self.retriever.retrieve(question)
+            except Exception as e:
+                raise RuntimeError(f"Failed to retrieve context from the question: {e}") from e
+            return self._plan(question, context)
+
+    def run_plan(self, plan: Dict[str, Any]):
+        """Execute a plan produced by `prepare` on the current dataset."""
+        with TRACER.span("run_plan", actions=len(plan.get("actions", []))):
+            try:
+                exec_results = self._make_executor().execute(plan)
+                return self.format_results(exec_results)
+            except Exception as e:
+                raise RuntimeError(f"Error executing the plan: {e}") from e
@@ -0,0 +1,167 @@
+import hashlib
+import sqlite3
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from pydantic import PrivateAttr
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed cache of text -> vector, keyed by model, backend and text, so
+    unchanged documents are never embedded twice, even across restarts.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # SQLite caps the number of bound parameters per statement
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM vectors WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update({k: np.frombuffer(v, dtype=np.float32).tolist() for k, v in rows})
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, vector) VALUES (?, ?)",
+                [(k, np.asarray(v, dtype=np.float32).tobytes()) for k, v in items.items()],
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()
+        return {"entries": entries, "hits": self.hits, "misses": self.misses}
+
+
+def _load_sentence_transformer(model_name: str, backend: str, threads: int, onnx_quantization: str, model_dir: Path):
+    from sentence_transformers import SentenceTransformer
+    import torch
+
+    torch.set_num_threads(threads)
+    if backend in ("torch", "torch-int8"):
+        model = SentenceTransformer(model_name, device="cpu")
+        if backend == "torch-int8":
+            # Dynamic int8 quantization of the Linear layers; weights are quantized once at load
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise RuntimeError(
+            f"The '{backend}' embedding backend needs ONNX Runtime: pip install 'sentence-transformers[onnx]'"
+        ) from e
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = threads
+    model_kwargs: Dict[str, Any] = {"provider": "CPUExecutionProvider", "session_options": options}
+    if backend == "onnx":
+        return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+    # onnx-int8: export and quantize once into the models directory, then reuse it
+    from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+    local = model_dir / "onnx" / model_name.replace("/", "__")
+    file_name = f"onnx/model_qint8_{onnx_quantization}.onnx"
+    if not (local / file_name).exists():
+        exported = SentenceTransformer(model_name, device="cpu", backend="onnx")
+        exported.save(str(local))
+        export_dynamic_quantized_onnx_model(exported, onnx_quantization, str(local))
+    return SentenceTransformer(
+        str(local), device="cpu", backend="onnx", model_kwargs={**model_kwargs, "file_name": file_name}
+    )
+
+
+class SentenceTransformerEmbedding(BaseEmbedding):
+    """
+    llama_index embedding backed by sentence-transformers on CPU, with a selectable
+    inference backend (see BACKENDS), explicit batch size and thread count, and an
+    optional on-disk text -> vector cache.
+    """
+
+    backend: str = "torch"
+    _model: Any = PrivateAttr()
+    _cache: Optional[EmbeddingCache] = PrivateAttr(default=None)
+    _query_instruction: Optional[str] = PrivateAttr(default=None)
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = "torch",
+        batch_size: int = 32,
+        threads: int = 8,
+        cache: Optional[EmbeddingCache] = None,
+        query_instruction: Optional[str] = None,
+        onnx_quantization: str = "avx512_vnni",
+        model_dir: Path = Path("models"),
+    ):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {BACKENDS})")
+        super().__init__(model_name=model_name, embed_batch_size=batch_size, backend=backend)
+        self._model = _load_sentence_transformer(model_name, backend, threads, onnx_quantization, model_dir)
+        self._cache = cache
+        self._query_instruction = query_instruction
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "SentenceTransformerEmbedding"
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._model.encode(
+            texts, batch_size=self.embed_batch_size, normalize_embeddings=True,
+            convert_to_numpy=True, show_progress_bar=False,
+        )
+        return vectors.astype(np.float32).tolist()
+
+    def _embed(self, texts: List[str]) -> List[List[float]]:
+        if self._cache is None:
+            return self._encode(texts)
+        namespace = f"{self.model_name}|{self.backend}"
+        keys = [EmbeddingCache.make_key(namespace, t) for t in texts]
+        found = self._cache.get_many(keys)
+        missing = {k: t for k, t in zip(keys, texts) if k not in found}
+        if missing:
+            fresh = dict(zip(missing, self._encode(list(missing.values()))))
+            self._cache.put_many(fresh)
+            found.update(fresh)
+        return [found[k] for k in keys]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        if self._query_instruction:
+            query = f"{self._query_instruction}{query}"
+        return self._embed([query])[0]
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._embed([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._embed(texts)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+    async def _aget_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embedding(text)
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+METHODS = ("pearson", "spearman")
+MAX_MATRICES = 8
+CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def _pair_sums(x: np.ndarray, y: np.ndarray):
+    """Pairwise-complete sums between the columns of x (n×a) and y (n×b)."""
+    mx, my = ~np.isnan(x), ~np.isnan(y)
+    if mx.all() and my.all():
+        a, b = x.shape[1], y.shape[1]
+        n = np.full((a, b), float(len(x)))
+        sx = np.broadcast_to(x.sum(axis=0)[:, None], (a, b))
+        sy = np.broadcast_to(y.sum(axis=0)[None, :], (a, b))
+        sxx = np.broadcast_to((x * x).sum(axis=0)[:, None], (a, b))
+        syy = np.broadcast_to((y * y).sum(axis=0)[None, :], (a, b))
+        return n, sx, sy, sxx, syy, x.T @ y
+    x0, y0 = np.where(mx, x, 0.0), np.where(my, y, 0.0)
+    fx, fy = mx.astype("float64"), my.astype("float64")
+    return fx.T @ fy, x0.T @ fy, fx.T @ y0, (x0 * x0).T @ fy, fx.T @ (y0 * y0), x0.T @ y0
+
+
+class CorrelationEngine:
+    """
+    Correlations computed with BLAS over column-centered data in row chunks, matching
+    pandas' pairwise-complete `DataFrame.corr`. A target against k columns is a single
+    O(n·k) pass; matrices are cached per dataset fingerprint and method and only grow
+    by the columns a request adds, so later `columns=` requests are slices.
+    """
+
+    def __init__(self, max_matrices: int = MAX_MATRICES, chunk_bytes: int = CHUNK_BYTES):
+        self.max_matrices = max_matrices
+        self.chunk_bytes = chunk_bytes
+        self._matrices: "OrderedDict[Tuple[str, str], pd.DataFrame]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _prepare(df: pd.DataFrame, columns: List[str], method: str) -> pd.DataFrame:
+        frame = df[columns]
+        return frame.rank() if method == "spearman" else frame
+
+    def _block(self, df: pd.DataFrame, rows: List[str], cols: List[str], method: str) -> pd.DataFrame:
+        """Correlation of every column in `rows` with every column in `cols`."""
+        involved = list(dict.fromkeys(rows + cols))
+        if method == "spearman" and df[involved].isna().any().any():
+            # pandas ranks each pair after dropping its missing rows; that has no blockwise form
+            return df[involved].corr(method="spearman").loc[rows, cols]
+
+        data = self._prepare(df, involved, method)
+        means = data.mean()
+        a, b = len(rows), len(cols)
+        step = max(1, self.chunk_bytes // (8 * (a + b)))
+        totals = None
+        for start in range(0, len(data), step):
+            chunk = data.iloc[start:start + step]
+            x = chunk[rows].to_numpy(dtype="float64", na_value=np.nan) - means[rows].to_numpy()
+            y = chunk[cols].to_numpy(dtype="float64", na_value=np.nan) - means[cols].to_numpy()
+            sums = _pair_sums(x, y)
+            totals = sums if totals is None else tuple(t + s for t, s in zip(totals, sums))
+
+        if totals is None:
+            return pd.DataFrame(np.nan, index=rows, columns=cols)
+        n, sx, sy, sxx, syy, sxy = totals
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vx = sxx - sx * sx / n
+            vy = syy - sy * sy / n
+            r = (sxy - sx * sy / n) / np.sqrt(vx * vy)
+            # Constant (pairwise) columns leave only rounding noise in the variance
+            r[(n < 2) | (vx <= 1e-12 * sxx) | (vy <= 1e-12 * syy)] = np.nan
+        return pd.DataFrame(np.clip(r, -1.0, 1.0), index=rows, columns=cols)
+
+    def target(
+        self, df: pd.DataFrame, target: str, columns: List[str],
+        method: str = "pearson", fingerprint: Optional[str] = None,
+    ) -> pd.Series:
+        """Correlation of `target` with each of `columns`, from the cached matrix when it covers them."""
+        if fingerprint is not None:
+            with self._lock:
+                cached = self._matrices.get((fingerprint, method))
+            if cached is not None and target in cached.index and set(columns) <= set(cached.columns):
+                return cached.loc[target, columns]
+        return self._block(df, [target], list(columns), method).loc[target]
+
+    def matrix(
+        self, df: pd.DataFrame, columns: List[str],
+        method: str = "pearson", fingerprint: Optional[str] = None,
+    ) -> pd.DataFrame:
+        columns = list(dict.fromkeys(columns))
+        if fingerprint is None:
+            return self._block(df, columns, columns, method)
+
+        key = (fingerprint, method)
+        with self._lock:
+            cached = self._matrices.get(key)
+        known = list(cached.index) if cached is not None else []
+        new = [c for c in columns if c not in set(known)]
+        if new:
+            every = known + new
+            block = self._block(df, new, every, method)
+            grown = (cached if cached is not None else pd.DataFrame(dtype="float64")).reindex(
+                index=every, columns=every
+            ).astype("float64")
+            grown.loc[new, every] = block.to_numpy()
+            grown.loc[every, new] = block.to_numpy().T
+            cached = grown
+        with self._lock:
+            self._matrices[key] = cached
+            self._matrices.move_to_end(key)
+            while len(self._matrices) > self.max_matrices:
+                self._matrices.popitem(last=False)
+        return cached.loc[columns, columns]
+
+    def clear(self):
+        with self._lock:
+            self._matrices.clear()
+
+
+CORRELATION_ENGINE = CorrelationEngine()
@@ -1,53 +1,216 @@
+import time
 import pandas as pd
-from typing import Any, Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from core.executor.result_cache import RESULT_CACHE, ResultCache
+from core.executor.sql_source import DuckDBSource
 from core.executor.strategies.base import ComputeStrategy
 from core.interfaces.iexecutor import IExecutor
 from core.interfaces.ivisualizer import IVisualizer
+from core.managers.profile import numeric_columns
+from core.tracing import TRACER, size_attributes
+from config import EXECUTOR_MAX_WORKERS
 
 class Executor(IExecutor):
-    def __init__(self, df: pd.DataFrame, strategies: Dict[str, ComputeStrategy], visualizer: IVisualizer):
-        self.df = df.copy()
+    def __init__(
+        self,
+        df: Optional[pd.DataFrame],
+        strategies: Dict[str, ComputeStrategy],
+        visualizer: IVisualizer,
+        load_frame: Optional[Callable[[], pd.DataFrame]] = None,
+        source: Optional[DuckDBSource] = None,
+        fingerprint: Optional[str] = None,
+        result_cache: Optional[ResultCache] = RESULT_CACHE,
+        max_workers: int = EXECUTOR_MAX_WORKERS,
+    ):
+        self.df = df
+        # Called the first time an action needs the pandas frame (when `df` is None)
+        self.load_frame = load_frame
         self.strategies = strategies
         self.visualizer = visualizer
+        self.source = source
+        self.fingerprint = fingerprint
+        self.result_cache = result_cache
+        self.max_workers = max_workers
 
-    def execute(self, plan: Dict[str, Any]) -> List[Dict[str, Any]]:
-        results = []
-        
-        for idx, action in enumerate(plan.get("actions", [])):
-            action_type = action.get("type")
+    def _cached_compute(self, strategy_name: str, strategy: ComputeStrategy, params: Dict[str, Any]):
+        """Return (value, cached). Results are memoized per dataset fingerprint; errors never are."""
+        if self.result_cache is None or self.fingerprint is None:
+            return self._compute(strategy, params), False
+        key = ResultCache.make_key(self.fingerprint, strategy_name, params)
+        hit, value = self.result_cache.get(key)
+        if hit:
+            return value, True
+        value = self._compute(strategy, params)
+        if not (isinstance(value, str) and value.startswith("[ERROR]")):
+            self.result_cache.put(key, value)
+        return value, False
+
+    def _compute(self, strategy: ComputeStrategy, params: Dict[str, Any]):
+        if self.source is not None:
             try:
-                if action_type == "compute":
-                    strategy_name = action.get("name")
-                    strategy = self.strategies.get(strategy_name)
-                    if strategy:
-                        params = {k: v for k, v in action.items() if k not in ["type", "name"]}
-                        value = strategy.compute(self.df, params)
-                        results.append({
-                            "type": "compute",
-                            "name": strategy_name,
-                            "value": value
-                        })
-                    else:
-                        results.append({
-                            "type": "error",
-                            "message": f"[ERROR] Unsupported compute strategy '{strategy_name}'"
-                        })
-                elif action_type == "answer":
-                    style = action.get("style", "detailed")
-                    text = action.get("text", "Answer not generated :(")
-                    results.append({
-                        "type": "answer",
-                        "style": style,
-                        "text": text
-                    })
-                elif action_type == "visualize":
-                    fig = self.visualizer.dispatch(self.df, action)
-                    results.append({ "type": "visualize", "name": action.get("name"), "figure": fig })
+                return strategy.compute_sql(self.source, params)
+            except NotImplementedError:
+                pass
+        return strategy.compute(self._frame(), params)
+
+    def _frame(self) -> pd.DataFrame:
+        if self.df is None and self.load_frame is not None:
+            self.df = self.load_frame()
+        return self.df
+
+    def _run_action(
+        self,
+        idx: int,
+        action: Dict[str, Any],
+        store: Optional[Dict[int, Any]] = None,
+        source: Optional[Tuple[int, Dict[str, Any]]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        action_type = action.get("type")
+        try:
+            if action_type == "compute":
+                strategy_name = action.get("name")
+                strategy = self.strategies.get(strategy_name)
+                if strategy:
+                    params = {k: v for k, v in action.items() if k not in ["type", "name"]}
+                    value, cached = self._cached_compute(strategy_name, strategy, params)
+                    if store is not None and not (isinstance(value, str) and value.startswith("[ERROR]")):
+                        store[idx] = value
+                    return {
+                        "type": "compute",
+                        "name": strategy_name,
+                        "value": value,
+                        "cached": cached
+                    }
+                return {
+                    "type": "error",
+                    "message": f"[ERROR] Unsupported compute strategy '{strategy_name}'"
+                }
+            elif action_type == "answer":
+                style = action.get("style", "detailed")
+                text = action.get("text", "Answer not generated :(")
+                return {
+                    "type": "answer",
+                    "style": style,
+                    "text": text
+                }
+            elif action_type == "visualize":
+                if source is not None and store is not None and source[0] in store:
+                    fig = self.visualizer.render_result(action, source[1], store[source[0]])
                 else:
-                    results.append({"type": "error", "message":f"Unsupported action: type {action_type}"})
-                
-            except Exception as e:
-                print(f"[EXECUTOR ERROR] Action {idx} failed: {e}")
-        
+                    fig = self.visualizer.render(self._frame(), action)
+                return { "type": "visualize", "name": action.get("name"), "figure": fig }
+            return {"type": "error", "message":f"Unsupported action: type {action_type}"}
+
+        except Exception as e:
+            print(f"[EXECUTOR ERROR] Action {idx} failed: {e}")
+            return None
+
+    @staticmethod
+    def _dependencies(idx: int, action: Dict[str, Any]) -> Set[int]:
+        """
+        Indices of earlier actions this one must wait for. Actions only read the dataset,
+        so they are independent unless the plan declares `depends_on` explicitly.
+        """
+        declared = action.get("depends_on", [])
+        if not isinstance(declared, list):
+            declared = [declared]
+        return {d for d in declared if isinstance(d, int) and 0 <= d < idx}
+
+    def _result_source(self, idx: int, action: Dict[str, Any], previous: List[Dict[str, Any]]) -> Optional[int]:
+        """
+        Index of the compute action whose result a visualize action is drawn from: the
+        one named by its `source` field, otherwise the closest earlier one whose kind and
+        parameters match the chart (a correlation matrix for a heatmap, a groupby for bars).
+        """
+        if action.get("type") != "visualize":
+            return None
+        accepts = getattr(self.visualizer, "accepts_result", None)
+        if accepts is None:
+            return None
+        explicit = action.get("source", (action.get("params") or {}).get("source"))
+        if isinstance(explicit, int) and 0 <= explicit < idx:
+            if previous[explicit].get("type") == "compute" and accepts(action, previous[explicit], explicit=True):
+                return explicit
+            return None
+        numeric = None
+        for j in range(idx - 1, -1, -1):
+            if previous[j].get("type") != "compute":
+                continue
+            if numeric is None:
+                numeric = self._numeric_columns()
+            if accepts(action, previous[j], numeric=numeric):
+                return j
+        return None
+
+    def _numeric_columns(self) -> List[str]:
+        if self.source is not None:
+            return self.source.numeric_columns
+        frame = self._frame()
+        return numeric_columns(frame) if frame is not None else []
+
+    def _span_name(self, action: Dict[str, Any]) -> str:
+        # Only names the executor knows become span (and metric label) names
+        action_type = action.get("type")
+        name = action.get("name")
+        if action_type == "compute" and name in self.strategies:
+            return f"compute.{name}"
+        if action_type == "visualize" and isinstance(name, str) and name.isidentifier() and len(name) <= 32:
+            return f"visualize.{name}"
+        return str(action_type) if action_type in ("compute", "visualize", "answer") else "action"
+
+    def _run_after(self, deps: List[Future], idx: int, action: Dict[str, Any], store: Dict[int, Any], source) -> Optional[Dict[str, Any]]:
+        t0 = time.perf_counter()
+        wait(deps)
+        with TRACER.span(self._span_name(action), index=idx) as span:
+            if deps:
+                span.set(waited_seconds=round(time.perf_counter() - t0, 4))
+            result = self._run_action(idx, action, store, source)
+            if result is None or result["type"] == "error":
+                span.fail(result["message"] if result else "action raised")
+            elif result["type"] == "compute":
+                value = result["value"]
+                span.set(cache_hit=result["cached"], rows=0 if result["cached"] else self._rows(), **size_attributes(value))
+                if isinstance(value, str) and value.startswith("[ERROR]"):
+                    span.fail(value)
+            elif result["type"] == "visualize":
+                from_result = source is not None and source[0] in store
+                span.set(from_result=from_result, rows=0 if from_result else self._rows(), **size_attributes(result["figure"]))
+        return result
+
+    def _rows(self) -> int:
+        if self.df is not None:
+            return len(self.df)
+        return self.source.n_rows if self.source is not None else 0
+
+    def execute(self, plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return self.execute_stream(plan.get("actions", []))
+
+    def execute_stream(self, actions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Schedule actions on a thread pool as they arrive (from a plan or a streaming planner).
+        Each action starts as soon as the actions it depends on are done, so independent
+        computations run concurrently and overlap the generation of the rest of the plan.
+        Results keep the plan order and a failing action never affects the others.
+
+        Compute results are kept in a per-plan store so visualize actions plot them directly
+        (a heatmap from the correlation matrix, bars from the grouped frame) instead of
+        recomputing from the dataset; if the compute failed they fall back to the raw data.
+        """
+        futures: List[Future] = []
+        previous: List[Dict[str, Any]] = []
+        store: Dict[int, Any] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for idx, action in enumerate(actions):
+                previous.append(action)
+                src = self._result_source(idx, action, previous)
+                deps = self._dependencies(idx, action) | ({src} if src is not None else set())
+                source = (src, previous[src]) if src is not None else None
+                # Each action runs in the submitter's context so its span nests under the question
+                futures.append(pool.submit(
+                    TRACER.wrap(self._run_after), [futures[d] for d in sorted(deps)], idx, action, store, source
+                ))
+            results = [r for r in (f.result() for f in futures) if r is not None]
+
         print("HERE ARE RESULTS OF EXECUTION", results)
-        return results
\ No newline at end of file
+        return results
@@ -0,0 +1,79 @@
+import json
+import pickle
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Tuple
+from config import RESULT_CACHE_MAX_BYTES
+
+
+def _normalize(value: Any) -> Any:
+    # Missing and None-valued params are equivalent for every strategy (params.get)
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+class ResultCache:
+    """
+    LRU cache of compute action results keyed by (dataset fingerprint, strategy, params).
+    Entries are evicted least-recently-used first once their pickled size exceeds `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(fingerprint: str, strategy_name: str, params: Dict[str, Any]) -> Tuple[str, str, str]:
+        canonical = json.dumps(_normalize(params), sort_keys=True, default=str)
+        return (fingerprint, strategy_name, canonical)
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        try:
+            size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._total_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+RESULT_CACHE = ResultCache(max_bytes=RESULT_CACHE_MAX_BYTES)
@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import pandas as pd
+
+NUMERIC_TYPES = {
+    "TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT",
+    "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT", "UHUGEINT",
+    "FLOAT", "DOUBLE",
+}
+INTEGER_TYPES = NUMERIC_TYPES - {"FLOAT", "DOUBLE"}
+ROW_ORDER = "__row_order"  # position of each row in the file, on the `data_rows` view
+TEMPORAL_TYPES = {"DATE", "TIMESTAMP", "TIMESTAMP_NS", "TIMESTAMP_MS", "TIMESTAMP_S", "TIMESTAMP WITH TIME ZONE"}
+
+
+def quote(identifier: str) -> str:
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+
+def literal(value: str) -> str:
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class DuckDBSource:
+    """
+    Out-of-core, multi-threaded view over a dataset file (Parquet or CSV) for the
+    SQL compute path. Strategies query the `data` view; nothing is loaded into pandas
+    except the (small) query results. The `data_rows` view adds the ROW_ORDER column,
+    for results that must break ties by row position like pandas does.
+    """
+
+    def __init__(self, path: str | Path, memory_limit: Optional[str] = None):
+        try:
+            import duckdb
+        except Exception as e:
+            raise RuntimeError(
+                "The 'duckdb' package is required for the duckdb compute backend but is not installed."
+            ) from e
+
+        self.path = Path(path)
+        self.con = duckdb.connect()
+        if memory_limit:
+            self.con.execute(f"SET memory_limit = '{memory_limit}'")
+
+        location = literal(self.path.resolve())
+        if self.path.suffix.lower() == ".parquet":
+            relation = f"read_parquet({location})"
+            numbered = (
+                f"SELECT * EXCLUDE (file_row_number), file_row_number AS {quote(ROW_ORDER)} "
+                f"FROM read_parquet({location}, file_row_number = true)"
+            )
+        elif self.path.suffix.lower() == ".csv":
+            relation = f"read_csv_auto({location})"
+            # CSV scans keep the file order (preserve_insertion_order is on by default)
+            numbered = f"SELECT *, row_number() OVER () - 1 AS {quote(ROW_ORDER)} FROM {relation}"
+        else:
+            raise ValueError(f"Unsupported extension for duckdb backend: {self.path.suffix}")
+        self.con.execute(f"CREATE VIEW data AS SELECT * FROM {relation}")
+        self.con.execute(f"CREATE VIEW data_rows AS {numbered}")
+
+        self._n_rows: Optional[int] = None
+        self.types: Dict[str, str] = {
+            name: str(col_type).upper()
+            for name, col_type, *_ in self.con.execute("DESCRIBE data").fetchall()
+        }
+
+    @property
+    def n_rows(self) -> int:
+        if self._n_rows is None:
+            self._n_rows = int(self.query_row("SELECT count(*) FROM data")[0])
+        return self._n_rows
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.types)
+
+    @property
+    def numeric_columns(self) -> List[str]:
+        return [c for c, t in self.types.items() if t in NUMERIC_TYPES or t.startswith("DECIMAL")]
+
+    def is_integer(self, column: str) -> bool:
+        return self.types.get(column) in INTEGER_TYPES
+
+    def is_temporal(self, column: str) -> bool:
+        return self.types.get(column) in TEMPORAL_TYPES
+
+    def query(self, sql: str, params: Optional[List[Any]] = None) -> pd.DataFrame:
+        # A cursor per call keeps concurrent queries on the same source thread-safe
+        cur = self.con.cursor()
+        try:
+            return cur.execute(sql, params or []).df()
+        finally:
+            cur.close()
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        return self.query(f"SELECT * FROM data LIMIT {int(n)}")
+
+    def query_row(self, sql: str, params: Optional[List[Any]] = None) -> tuple:
+        cur = self.con.cursor()
+        try:
+            return cur.execute(sql, params or []).fetchone()
+        finally:
+            cur.close()
+
+    def close(self):
+        self.con.close()
@@ -1,7 +1,16 @@
 import pandas as pd
 from typing import Dict, Any
+from core.executor.sql_source import DuckDBSource
 
 
 class ComputeStrategy:
     def compute(self, df: pd.DataFrame, params: Dict[str, Any]):
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    def compute_sql(self, source: DuckDBSource, params: Dict[str, Any]):
+        """
+        Same action as `compute`, run as SQL over the dataset file.
+        Strategies without a SQL translation raise NotImplementedError and the
+        executor falls back to the pandas path.
+        """
+        raise NotImplementedError
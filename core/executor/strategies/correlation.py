@@ -1,31 +1,86 @@
 from typing import Any, Dict
+from core.executor.correlation_engine import CORRELATION_ENGINE, METHODS, CorrelationEngine
 from core.executor.strategies.base import ComputeStrategy
+from core.executor.sql_source import DuckDBSource, quote
+from core.managers.profile import PROFILE_CACHE, numeric_columns
+import pandas as pd
 
 
 class CorrelationStrategy(ComputeStrategy):
+    def __init__(self, engine: CorrelationEngine = CORRELATION_ENGINE):
+        self.engine = engine
+
     def compute(self, df, params: Dict[str, Any]):
         try:
+            method = params.get("method", "pearson")
+            if method not in METHODS:
+                return f"[ERROR] Unsupported correlation method '{method}' (pearson/spearman)"
+            # Matrices are only cached for loaded datasets, identified by their profile
+            profile = PROFILE_CACHE.lookup(df)
+            fingerprint = profile.fingerprint if profile is not None else None
+
             if "target" in params:
                 target = params["target"]
                 top_n = params.get("top_n", 5)
 
                 # restrict to numeric only
-                numeric_df = df.select_dtypes(include=["number"])
-                if target not in numeric_df.columns:
+                numeric = numeric_columns(df)
+                if target not in numeric:
                     return f"[ERROR] Target column '{target}' not found or not numeric"
 
-                corr = numeric_df.corr().get(target)
-                if corr is None:
-                    return f"[ERROR] Target column '{target}' not found"
-                s = corr.drop(labels=[target], errors="ignore").abs().sort_values(ascending=False).head(top_n)
+                others = [c for c in numeric if c != target]
+                corr = self.engine.target(df, target, others, method, fingerprint)
+                s = corr.abs().sort_values(ascending=False).head(top_n)
                 return s.to_dict()
 
             elif "columns" in params:
                 # filter only numeric cols
-                cols = [c for c in params["columns"] if c in df.select_dtypes(include=["number"]).columns]
+                numeric = set(numeric_columns(df))
+                cols = [c for c in params["columns"] if c in numeric]
+                if not cols:
+                    return "[ERROR] No valid numeric columns found for correlation"
+                return self.engine.matrix(df, cols, method, fingerprint).to_dict()
+
+            else:
+                return "[ERROR] Missing 'target' or 'columns' in correlation params"
+
+        except Exception as e:
+            return f"[ERROR] compute_correlation failed: {e}"
+
+    def compute_sql(self, source: DuckDBSource, params: Dict[str, Any]):
+        if params.get("method", "pearson") != "pearson":
+            raise NotImplementedError("only Pearson correlations have a SQL translation")
+        try:
+            numeric = source.numeric_columns
+            if "target" in params:
+                target = params["target"]
+                top_n = params.get("top_n", 5)
+
+                if target not in numeric:
+                    return f"[ERROR] Target column '{target}' not found or not numeric"
+
+                others = [c for c in numeric if c != target]
+                if not others:
+                    return {}
+                row = source.query_row(
+                    "SELECT " + ", ".join(f"corr({quote(target)}, {quote(c)})" for c in others) + " FROM data"
+                )
+                corr = pd.Series([float("nan") if r is None else r for r in row], index=others, dtype="float64")
+                s = corr.abs().sort_values(ascending=False).head(top_n)
+                return s.to_dict()
+
+            elif "columns" in params:
+                cols = [c for c in params["columns"] if c in numeric]
                 if not cols:
                     return "[ERROR] No valid numeric columns found for correlation"
-                return df[cols].corr().to_dict()
+                pairs = [(a, b) for i, a in enumerate(cols) for b in cols[i:]]
+                row = source.query_row(
+                    "SELECT " + ", ".join(f"corr({quote(a)}, {quote(b)})" for a, b in pairs) + " FROM data"
+                )
+                matrix = pd.DataFrame(index=cols, columns=cols, dtype="float64")
+                for (a, b), r in zip(pairs, row):
+                    matrix.loc[a, b] = matrix.loc[b, a] = float("nan") if r is None else r
+                return matrix.to_dict()
 
             else:
                 return "[ERROR] Missing 'target' or 'columns' in correlation params"
@@ -1,5 +1,9 @@
 from typing import Any, Dict
 from core.executor.strategies.base import ComputeStrategy
+from core.executor.sql_source import DuckDBSource, quote
+from core.managers.profile import numeric_columns
+
+DESCRIBE_STATS = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
 
 
 class DescribeStrategy(ComputeStrategy):
@@ -9,10 +13,42 @@ class DescribeStrategy(ComputeStrategy):
             valid = [c for c in cols if c in df.columns]
             if not valid:
                 return "[ERROR] No valid columns for describe"
-            numeric_valid = [c for c in valid if c in df.select_dtypes(include="number").columns]
+            numeric = set(numeric_columns(df))
+            numeric_valid = [c for c in valid if c in numeric]
             if not numeric_valid:
                 return "[ERROR] No valid numeric columns for describe"
             return df[numeric_valid].describe().to_dict()
 
+        except Exception as e:
+            return f"[ERROR] compute_describe failed: {e}"
+
+    def compute_sql(self, source: DuckDBSource, params: Dict[str, Any]):
+        try:
+            cols = params.get("columns", source.columns)
+            valid = [c for c in cols if c in source.types]
+            if not valid:
+                return "[ERROR] No valid columns for describe"
+            numeric_valid = [c for c in valid if c in source.numeric_columns]
+            if not numeric_valid:
+                return "[ERROR] No valid numeric columns for describe"
+
+            exprs = []
+            for c in numeric_valid:
+                q = quote(c)
+                exprs += [
+                    f"count({q})", f"avg({q})", f"stddev_samp({q})", f"min({q})",
+                    f"quantile_cont({q}, 0.25)", f"quantile_cont({q}, 0.5)", f"quantile_cont({q}, 0.75)", f"max({q})",
+                ]
+            row = source.query_row(f"SELECT {', '.join(exprs)} FROM data")
+
+            result = {}
+            for i, c in enumerate(numeric_valid):
+                values = row[i * len(DESCRIBE_STATS):(i + 1) * len(DESCRIBE_STATS)]
+                result[c] = {
+                    stat: float(v) if v is not None else float("nan")
+                    for stat, v in zip(DESCRIBE_STATS, values)
+                }
+            return result
+
         except Exception as e:
             return f"[ERROR] compute_describe failed: {e}"
\ No newline at end of file
@@ -1,6 +1,26 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from core.executor.strategies.base import ComputeStrategy
+from core.executor.sql_source import ROW_ORDER, DuckDBSource, quote
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+SQL_OPERATORS = {">", "<", "==", ">=", "<=", "!="}
+
+
+def _type_mismatch(column: str, numeric: bool, boolean: bool, value: Any) -> Optional[str]:
+    """
+    Error for a value whose type cannot be compared with the column. DuckDB would cast
+    it implicitly (`k == "3"` matching k = 3) where pandas matches nothing, so both
+    backends reject it instead.
+    """
+    if isinstance(value, bool) or boolean:
+        return None
+    if numeric and isinstance(value, str):
+        return f"[ERROR] filter failed: column '{column}' is numeric but the value {value!r} is a string"
+    if not numeric and isinstance(value, (int, float)):
+        return f"[ERROR] filter failed: column '{column}' is not numeric but the value {value!r} is a number"
+    return None
 
 
 class FilterStrategy(ComputeStrategy):
@@ -19,28 +39,94 @@ class FilterStrategy(ComputeStrategy):
             
             if column not in df.columns:
                 return f"[ERROR] Column '{column}' not found"
-            
-            # Apply filter
+
+            # Build the mask on the single column; only the sampled rows are materialized
+            s = df[column]
+            boolean = is_bool_dtype(s.dtype)
+            mismatch = _type_mismatch(column, is_numeric_dtype(s.dtype) and not boolean, boolean, value)
+            if mismatch:
+                return mismatch
+            codes = None
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                # Compare the few categories as plain values and map the result through the
+                # codes: categoricals refuse ordering comparisons with values outside them
+                codes = s.cat.codes.to_numpy()
+                s = pd.Series(s.cat.categories.astype(object))
             if operator == ">":
-                result = df[df[column] > value]
+                mask = s > value
             elif operator == "<":
-                result = df[df[column] < value]
+                mask = s < value
             elif operator == "==":
-                result = df[df[column] == value]
+                mask = s == value
             elif operator == ">=":
-                result = df[df[column] >= value]
+                mask = s >= value
             elif operator == "<=":
-                result = df[df[column] <= value]
+                mask = s <= value
             elif operator == "!=":
-                result = df[df[column] != value]
+                mask = s != value
             else:
                 return f"[ERROR] Unknown operator: {operator}"
-            
+
+            mask = mask.to_numpy(dtype=bool, na_value=False)
+            if codes is not None:
+                # Missing values (code -1, the appended entry) only match "!=", as NaN does
+                mask = np.append(mask, operator == "!=")[codes]
+            positions = np.flatnonzero(mask)
             return {
-                "filtered_count": len(result),
+                "filtered_count": len(positions),
                 "total_count": len(df),
-                "sample": result.head(10).to_dict(orient="records")
+                "sample": df.iloc[positions[:10]].to_dict(orient="records")
             }
             
+        except Exception as e:
+            return f"[ERROR] filter failed: {e}"
+
+    def compute_sql(self, source: DuckDBSource, params: Dict[str, Any]):
+        try:
+            column = params.get("column")
+            operator = params.get("operator")
+            value = params.get("value")
+
+            if not column:
+                return "[ERROR] filter requires 'column' parameter"
+            if not operator:
+                return "[ERROR] filter requires 'operator' parameter"
+            if value is None:
+                return "[ERROR] filter requires 'value' parameter"
+
+            if column not in source.types:
+                return f"[ERROR] Column '{column}' not found"
+            mismatch = _type_mismatch(
+                column, column in source.numeric_columns, source.types[column] == "BOOLEAN", value
+            )
+            if mismatch:
+                return mismatch
+            if operator not in SQL_OPERATORS:
+                return f"[ERROR] Unknown operator: {operator}"
+
+            q = quote(column)
+            if operator == "==":
+                condition = f"{q} = ?"
+            elif operator == "!=":
+                # pandas treats NaN != value as True
+                condition = f"({q} != ? OR {q} IS NULL)"
+            else:
+                condition = f"{q} {operator} ?"
+
+            filtered_count, total_count = source.query_row(
+                f"SELECT count(*) FILTER (WHERE {condition}), count(*) FROM data", [value]
+            )
+            # The first matching rows in file order, as the pandas sample
+            row = quote(ROW_ORDER)
+            sample = source.query(
+                f"SELECT * EXCLUDE ({row}) FROM data_rows WHERE {condition} ORDER BY {row} LIMIT 10", [value]
+            )
+
+            return {
+                "filtered_count": int(filtered_count),
+                "total_count": int(total_count),
+                "sample": sample.to_dict(orient="records")
+            }
+
         except Exception as e:
             return f"[ERROR] filter failed: {e}"
\ No newline at end of file
@@ -1,7 +1,20 @@
 from typing import Any, Dict
 from core.executor.strategies.base import ComputeStrategy
+from core.executor.sql_source import DuckDBSource, quote
+from core.managers.profile import numeric_columns
 import pandas as pd
 
+SQL_AGGREGATES = {
+    "mean": "avg({})",
+    "median": "median({})",
+    "min": "min({})",
+    "max": "max({})",
+    "count": "count({})",
+    "nunique": "count(DISTINCT {})",
+    "std": "stddev_samp({})",
+    "var": "var_samp({})",
+}
+
 
 class GroupByStrategy(ComputeStrategy):
     def compute(self, df: pd.DataFrame, params: Dict[str, Any]):
@@ -12,18 +25,57 @@ class GroupByStrategy(ComputeStrategy):
             agg = params.get("agg", "mean")
             target = params.get("target")
 
+            # observed=True: categorical keys never produce empty groups
             # Only use numeric columns for mean/median/sum if target not specified
             if agg in ("mean", "median", "sum"):
                 if target:
-                    if target not in df.select_dtypes(include="number").columns:
+                    if target not in numeric_columns(df):
                         return f"[ERROR] Target column '{target}' is not numeric for agg='{agg}'"
-                    group_df = df.groupby(by)[target].agg(agg).reset_index()
+                    group_df = df.groupby(by, observed=True)[target].agg(agg).reset_index()
                 else:
-                    numeric_cols = df.select_dtypes(include="number").columns
-                    group_df = df.groupby(by)[numeric_cols].agg(agg).reset_index()
+                    numeric_cols = numeric_columns(df)
+                    group_df = df.groupby(by, observed=True)[numeric_cols].agg(agg).reset_index()
             else:
-                group_df = df.groupby(by).agg(agg).reset_index()
+                group_df = df.groupby(by, observed=True).agg(agg).reset_index()
+
+            return group_df.to_dict(orient="records")
+        except Exception as e:
+            return f"[ERROR] compute_groupby failed: {e}"
+
+    def compute_sql(self, source: DuckDBSource, params: Dict[str, Any]):
+        by = params.get("by")
+        agg = params.get("agg", "mean")
+        target = params.get("target")
+        if agg != "sum" and agg not in SQL_AGGREGATES:
+            raise NotImplementedError(f"agg '{agg}' has no SQL translation")
+        try:
+            if not by or by not in source.types:
+                return f"[ERROR] Invalid groupby column: {by}"
+
+            if agg in ("mean", "median", "sum"):
+                if target:
+                    if target not in source.numeric_columns:
+                        return f"[ERROR] Target column '{target}' is not numeric for agg='{agg}'"
+                    cols = [target]
+                else:
+                    cols = [c for c in source.numeric_columns if c != by]
+            else:
+                cols = [c for c in source.columns if c != by]
+
+            exprs = []
+            for c in cols:
+                if agg == "sum":
+                    # pandas sums empty/all-NaN groups to 0 and keeps integer sums integral
+                    cast = "BIGINT" if source.is_integer(c) else "DOUBLE"
+                    expr = f"CAST(coalesce(sum({quote(c)}), 0) AS {cast})"
+                else:
+                    expr = SQL_AGGREGATES[agg].format(quote(c))
+                exprs.append(f"{expr} AS {quote(c)}")
 
+            group_df = source.query(
+                f"SELECT {quote(by)}, {', '.join(exprs)} FROM data "
+                f"WHERE {quote(by)} IS NOT NULL GROUP BY {quote(by)} ORDER BY {quote(by)}"
+            )
             return group_df.to_dict(orient="records")
         except Exception as e:
             return f"[ERROR] compute_groupby failed: {e}"
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import Any, Dict
 from core.executor.strategies.base import ComputeStrategy
+from core.executor.sql_source import DuckDBSource, quote
 import pandas as pd
 
 
@@ -22,15 +23,47 @@ class TimeSeriesAggregateStrategy(ComputeStrategy):
             if value_col not in df.columns:
                 return f"[ERROR] Value column '{value_col}' not found"
             
-            # Convert to datetime
-            df_copy = df.copy()
-            df_copy[date_col] = pd.to_datetime(df_copy[date_col])
-            
-            # Set index and resample
-            df_copy = df_copy.set_index(date_col)
-            result = df_copy[value_col].resample(freq).sum().reset_index()
+            # Index only the value column by the parsed dates; the rest of the frame is never touched
+            dates = pd.DatetimeIndex(pd.to_datetime(df[date_col]), name=date_col)
+            result = df[value_col].set_axis(dates).resample(freq).sum().reset_index()
             
             return result.to_dict(orient="records")
             
         except Exception as e:
-            return f"[ERROR] timeseries_aggregate failed: {e}"
\ No newline at end of file
+            return f"[ERROR] timeseries_aggregate failed: {e}"
+
+    def compute_sql(self, source: DuckDBSource, params: Dict[str, Any]):
+        date_col = params.get("date_column")
+        value_col = params.get("value_column")
+        freq = params.get("freq")
+        if not date_col:
+            return "[ERROR] timeseries_aggregate requires 'date_column'"
+        if not value_col:
+            return "[ERROR] timeseries_aggregate requires 'value_column'"
+        if not freq:
+            return "[ERROR] timeseries_aggregate requires 'freq' (D/W/M/Q/Y)"
+
+        if date_col not in source.types:
+            return f"[ERROR] Date column '{date_col}' not found"
+        if value_col not in source.types:
+            return f"[ERROR] Value column '{value_col}' not found"
+
+        try:
+            offset = pd.tseries.frequencies.to_offset(freq)
+            sub_daily = isinstance(offset, pd.offsets.Tick) and offset.nanos < pd.offsets.Day().nanos
+            d, v = quote(date_col), quote(value_col)
+
+            if source.is_temporal(date_col) and value_col in source.numeric_columns and not sub_daily:
+                # Sums are decomposable: pre-aggregate per day in SQL, then resample the daily series
+                cast = "BIGINT" if source.is_integer(value_col) else "DOUBLE"
+                daily = source.query(
+                    f"SELECT date_trunc('day', {d}) AS {d}, CAST(coalesce(sum({v}), 0) AS {cast}) AS {v} "
+                    f"FROM data WHERE {d} IS NOT NULL GROUP BY 1"
+                )
+            else:
+                # Only the two referenced columns are pulled into pandas
+                daily = source.query(f"SELECT {d}, {v} FROM data")
+        except Exception as e:
+            return f"[ERROR] timeseries_aggregate failed: {e}"
+
+        return self.compute(daily, params)
\ No newline at end of file
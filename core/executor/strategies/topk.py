@@ -1,5 +1,6 @@
 from typing import Any, Dict
 from core.executor.strategies.base import ComputeStrategy
+from core.executor.sql_source import ROW_ORDER, DuckDBSource, quote
 import pandas as pd
 
 
@@ -26,5 +27,38 @@ class TopKStrategy(ComputeStrategy):
             
             return result.to_dict(orient="records")
             
+        except Exception as e:
+            return f"[ERROR] topk failed: {e}"
+
+    def compute_sql(self, source: DuckDBSource, params: Dict[str, Any]):
+        try:
+            column = params.get("column")
+            k = params.get("k")
+            ascending = params.get("ascending", False)
+
+            if not column:
+                return "[ERROR] topk requires 'column' parameter"
+            if not k:
+                return "[ERROR] topk requires 'k' parameter"
+
+            if column not in source.types:
+                return f"[ERROR] Column '{column}' not found"
+
+            if not isinstance(k, int) or k <= 0:
+                return f"[ERROR] 'k' must be a positive integer, got {k}"
+
+            if column not in source.numeric_columns:
+                return f"[ERROR] topk failed: Column '{column}' is not numeric"
+
+            # Ties go to the earlier row, as with nlargest/nsmallest(keep="first")
+            order = "ASC" if ascending else "DESC"
+            row = quote(ROW_ORDER)
+            result = source.query(
+                f"SELECT * EXCLUDE ({row}) FROM data_rows WHERE {quote(column)} IS NOT NULL "
+                f"ORDER BY {quote(column)} {order}, {row} LIMIT {k}"
+            )
+
+            return result.to_dict(orient="records")
+
         except Exception as e:
             return f"[ERROR] topk failed: {e}"
\ No newline at end of file
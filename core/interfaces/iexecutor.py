@@ -1,4 +1,5 @@
-from typing import Protocol, Dict, Any, List
+from typing import Protocol, Dict, Any, Iterable, List
 
 class IExecutor(Protocol):
-    def execute(self, plan: Dict[str, Any]) -> List[Dict[str, Any]]: ...
\ No newline at end of file
+    def execute(self, plan: Dict[str, Any]) -> List[Dict[str, Any]]: ...
+    def execute_stream(self, actions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]: ...
\ No newline at end of file
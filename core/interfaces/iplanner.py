@@ -1,4 +1,5 @@
-from typing import Protocol, Dict
+from typing import Protocol, Dict, Iterator
 
 class IPlanner(Protocol):
-    def plan(self, question: str, dataset_summary: str, columns: list, context: str = "") -> Dict: ...
\ No newline at end of file
+    def plan(self, question: str, dataset_summary: str, columns: list, context: str = "") -> Dict: ...
+    def plan_stream(self, question: str, dataset_summary: str, columns: list, context: str = "") -> Iterator[Dict]: ...
\ No newline at end of file
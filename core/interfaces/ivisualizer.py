@@ -1,6 +1,7 @@
-from typing import Protocol, List
+from typing import Protocol, List, Optional
 import pandas as pd
 from matplotlib.figure import Figure
+from core.visualizer.renderer import RenderedFigure
 
 class IVisualizer(Protocol):
     def heatmap(self, df: pd.DataFrame, columns: List[str]) -> Figure: ...
@@ -9,5 +10,10 @@ class IVisualizer(Protocol):
     def histogram(self, df: pd.DataFrame, column: str, bins: int = 30) -> Figure: ...
     def barplot(self, df: pd.DataFrame, x: str, y: str = None) -> Figure: ...
     def lineplot(self, df: pd.DataFrame, x: str, y: str) -> Figure: ...
+    def timeseries(self, df: pd.DataFrame, date_column: str, value_column: str, freq: str = None) -> Figure: ...
     def piechart(self, df: pd.DataFrame, column: str) -> Figure: ...
-    def dispatch(self, df: pd.DataFrame, step: dict) -> Figure | None: ...
\ No newline at end of file
+    def dispatch(self, df: pd.DataFrame, step: dict) -> Figure | None: ...
+    def render(self, df: pd.DataFrame, step: dict) -> RenderedFigure | None: ...
+    def accepts_result(self, step: dict, compute: dict, explicit: bool = False, numeric: Optional[List[str]] = None) -> bool: ...
+    def dispatch_result(self, step: dict, compute: dict, value) -> Figure | None: ...
+    def render_result(self, step: dict, compute: dict, value) -> RenderedFigure | None: ...
\ No newline at end of file
@@ -1,5 +1,12 @@
-from threading import Lock
+from threading import BoundedSemaphore, Lock
+import asyncio
 import os
+import random
+import time
+import weakref
+from typing import Iterator
+from core.llm_cache import LLMCache
+from core.tracing import TRACER
 
 
 class LLM:
@@ -19,29 +26,91 @@ class LLM:
 
                     try:
                         import openai
+                        import httpx
                     except Exception as e:
                         raise RuntimeError(
                             "The 'openai' package is required for LLM but is not installed."
                         ) from e
 
-                    # Configure API base (for local vLLM OpenAI-compatible server)
-                    if openai_api_base:
-                        openai.api_base = openai_api_base
+                    # vLLM batches concurrent requests, so requests are only bounded, never serialized
+                    max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+                    timeout = float(os.getenv("LLM_TIMEOUT", "120"))
 
-                    if openai_api_key:
-                        # prefer explicit API key from env (still accepted by vLLM if set)
-                        openai.api_key = openai_api_key
+                    # Opt-in response cache. Only deterministic requests (LLM_DETERMINISTIC=1,
+                    # temperature 0) are cached: replaying one sample of a sampled request
+                    # would silently pin it to a single answer
+                    cache_path = os.getenv("LLM_CACHE_PATH")
+                    deterministic = os.getenv("LLM_DETERMINISTIC", "0") == "1"
+                    cache = None
+                    if cache_path and not deterministic:
+                        print("[LLM] LLM_CACHE_PATH ignored: responses are only cached with LLM_DETERMINISTIC=1")
+                    elif cache_path:
+                        cache = LLMCache(
+                            cache_path,
+                            ttl=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+                            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000")),
+                        )
 
-                    cls._instance = super().__new__(cls)
-                    cls._instance.client = openai
-                    cls._instance.model_name = openai_model
+                    instance = super().__new__(cls)
+                    instance._openai = openai
+                    instance._httpx = httpx
+                    instance._client_kwargs = {
+                        # Configure API base (for local vLLM OpenAI-compatible server)
+                        "base_url": openai_api_base,
+                        # vLLM accepts any key, but the SDK requires one to be set
+                        "api_key": openai_api_key or "EMPTY",
+                        "timeout": timeout,
+                        # Retries are handled here so backoff is configurable
+                        "max_retries": 0,
+                    }
+                    instance._limits = httpx.Limits(
+                        max_connections=max_concurrency, max_keepalive_connections=max_concurrency
+                    )
+                    instance.client = openai.OpenAI(
+                        http_client=httpx.Client(limits=instance._limits, timeout=timeout),
+                        **instance._client_kwargs,
+                    )
+                    instance._async_clients = weakref.WeakKeyDictionary()
+                    instance._semaphore = BoundedSemaphore(max_concurrency)
+                    instance.max_concurrency = max_concurrency
+                    instance.max_retries = int(os.getenv("LLM_MAX_RETRIES", "3"))
+                    instance.backoff = float(os.getenv("LLM_BACKOFF", "0.5"))
+                    instance.model_name = openai_model
+                    instance.cache = cache
+                    instance.deterministic = deterministic
+                    # Ask streaming servers for a final usage chunk (token counts for tracing)
+                    instance.stream_usage = os.getenv("LLM_STREAM_USAGE", "1") == "1"
+                    cls._instance = instance
         return cls._instance
 
     def get_client(self):
         return self.client
 
-    def generate(self, messages: list | str) -> str:
+    def _get_async_client(self):
+        """One pooled async client and semaphore per event loop (httpx clients are loop-bound)."""
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+        if entry is None:
+            client = self._openai.AsyncOpenAI(
+                http_client=self._httpx.AsyncClient(limits=self._limits, timeout=self._client_kwargs["timeout"]),
+                **self._client_kwargs,
+            )
+            entry = (client, asyncio.Semaphore(self.max_concurrency))
+            self._async_clients[loop] = entry
+        return entry
+
+    def _is_retryable(self, error: Exception) -> bool:
+        return isinstance(error, (
+            self._openai.APITimeoutError,
+            self._openai.APIConnectionError,
+            self._openai.RateLimitError,
+            self._openai.InternalServerError,
+        ))
+
+    def _backoff_delay(self, attempt: int) -> float:
+        return self.backoff * (2 ** attempt) * (0.5 + random.random())
 
+    def _prepare(self, messages: list | str):
         if isinstance(messages, str):
             messages = [{"role": "user", "content": messages}]
 
@@ -55,29 +124,144 @@ class LLM:
                 role = "user"
             payload_messages.append({"role": role, "content": content})
 
-        temperature = 0.7
-        top_p = 0.95
-        max_tokens = 1024
+        params = {
+            "temperature": 0.0 if self.deterministic else 0.7,
+            "top_p": 1.0 if self.deterministic else 0.95,
+            "max_tokens": 1024,
+        }
 
-        try:
-            with self._lock:
-                # Use ChatCompletion for widest compatibility
-                resp = self.client.ChatCompletion.create(
-                    model=self.model_name,
-                    messages=payload_messages,
-                    temperature=temperature,
-                    top_p=top_p,
-                    max_tokens=max_tokens,
-                    n=1,
-                )
-
-                choice = resp["choices"][0]
-                if "message" in choice:
-                    generated_text = choice["message"].get("content", "").strip()
-                else:
-                    generated_text = choice.get("text", "").strip()
+        cache_key = None
+        if self.cache is not None and self.deterministic:
+            cache_key = LLMCache.make_key(self.model_name, payload_messages, params)
+        return payload_messages, params, cache_key
+
+    @staticmethod
+    def _extract_text(resp) -> str:
+        return (resp.choices[0].message.content or "").strip()
+
+    @staticmethod
+    def _record_usage(span, usage):
+        if usage is not None:
+            span.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+
+    def generate(self, messages: list | str) -> str:
+        with TRACER.span("llm.generate", model=self.model_name) as span:
+            payload_messages, params, cache_key = self._prepare(messages)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    return cached
+
+            try:
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        with self._semaphore:
+                            resp = self.client.chat.completions.create(
+                                model=self.model_name, messages=payload_messages, n=1, **params
+                            )
+                        break
+                    except Exception as e:
+                        if attempt == self.max_retries or not self._is_retryable(e):
+                            raise
+                        span.set(retries=attempt + 1)
+                        time.sleep(self._backoff_delay(attempt))
 
+                self._record_usage(span, getattr(resp, "usage", None))
+                generated_text = self._extract_text(resp)
+                if cache_key is not None:
+                    self.cache.put(cache_key, generated_text)
                 return generated_text
+            except Exception as e:
+                print(f"Erreur lors de la génération: {e}")
+                span.fail(str(e))
+                return f"Erreur: {str(e)}"
+
+    def stream_generate(self, messages: list | str) -> Iterator[str]:
+        """
+        Yield the completion as text deltas while the server decodes it.
+        Retries only happen before the first token; errors are raised, not returned.
+        """
+        # Not the active span: it stays open across yields (see Tracer.start_span)
+        span = TRACER.start_span("llm.stream", model=self.model_name)
+        try:
+            payload_messages, params, cache_key = self._prepare(messages)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if span is not None:
+                    span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    yield cached
+                    return
+
+            if self.stream_usage:
+                params = {**params, "stream_options": {"include_usage": True}}
+            parts = []
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with self._semaphore:
+                        stream = self.client.chat.completions.create(
+                            model=self.model_name, messages=payload_messages, n=1, stream=True, **params
+                        )
+                        for chunk in stream:
+                            if span is not None:
+                                self._record_usage(span, getattr(chunk, "usage", None))
+                            if not chunk.choices:
+                                continue
+                            delta = chunk.choices[0].delta.content
+                            if delta:
+                                if not parts and span is not None:
+                                    span.set(first_token_seconds=round(time.perf_counter() - span._t0, 4))
+                                parts.append(delta)
+                                yield delta
+                    break
+                except Exception as e:
+                    if parts or attempt == self.max_retries or not self._is_retryable(e):
+                        raise
+                    if span is not None:
+                        span.set(retries=attempt + 1)
+                    time.sleep(self._backoff_delay(attempt))
+
+            if cache_key is not None:
+                self.cache.put(cache_key, "".join(parts).strip())
         except Exception as e:
-            print(f"Erreur lors de la génération: {e}")
-            return f"Erreur: {str(e)}"
\ No newline at end of file
+            if span is not None:
+                span.fail(str(e))
+            raise
+        finally:
+            TRACER.end_span(span)
+
+    async def agenerate(self, messages: list | str) -> str:
+        """Async counterpart of `generate`; concurrent calls share the pooled connections."""
+        with TRACER.span("llm.generate", model=self.model_name) as span:
+            payload_messages, params, cache_key = self._prepare(messages)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                span.set(cache_hit=cached is not None)
+                if cached is not None:
+                    return cached
+
+            client, semaphore = self._get_async_client()
+            try:
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        async with semaphore:
+                            resp = await client.chat.completions.create(
+                                model=self.model_name, messages=payload_messages, n=1, **params
+                            )
+                        break
+                    except Exception as e:
+                        if attempt == self.max_retries or not self._is_retryable(e):
+                            raise
+                        span.set(retries=attempt + 1)
+                        await asyncio.sleep(self._backoff_delay(attempt))
+
+                self._record_usage(span, getattr(resp, "usage", None))
+                generated_text = self._extract_text(resp)
+                if cache_key is not None:
+                    self.cache.put(cache_key, generated_text)
+                return generated_text
+            except Exception as e:
+                print(f"Erreur lors de la génération: {e}")
+                span.fail(str(e))
+                return f"Erreur: {str(e)}"
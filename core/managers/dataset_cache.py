@@ -0,0 +1,127 @@
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, Dict, Hashable, Tuple
+import pandas as pd
+from config import DATASET_CACHE_MAX_BYTES
+
+MAX_FINGERPRINTS = 1024  # memoized (path, size, mtime) -> hash entries
+
+
+def _stat_key(path: Path) -> Tuple[str, int, int]:
+    st = path.stat()
+    return (str(path.resolve()), st.st_size, st.st_mtime_ns)
+
+
+class DatasetCache:
+    """
+    Process-wide LRU cache of loaded DataFrames.
+
+    Entries are keyed by the file's content fingerprint, so every DatasetManager
+    (uploader, preview, agent) shares a single parsed copy. Eviction follows
+    least-recently-used order once the total in-memory size exceeds `max_bytes`.
+
+    Sessions pin the dataset they are working on (`pin=True`, then `release`): a
+    pinned entry is never evicted, so a dataset in use is never parsed a second time
+    by another session and memory grows with distinct datasets, not with users.
+    """
+
+    def __init__(self, max_bytes: int, max_fingerprints: int = MAX_FINGERPRINTS):
+        self.max_bytes = max_bytes
+        self.max_fingerprints = max_fingerprints
+        self._entries: "OrderedDict[Hashable, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._fingerprints: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._pins: Dict[Hashable, int] = {}
+        self._total_bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def fingerprint(self, path: str | Path) -> str:
+        """
+        Content hash of the file. Computed once per (path, size, mtime) and memoized
+        (the most recent `max_fingerprints` files), so unchanged files are never re-hashed.
+        """
+        p = Path(path)
+        key = _stat_key(p)
+        with self._lock:
+            fp = self._fingerprints.get(key)
+            if fp is not None:
+                self._fingerprints.move_to_end(key)
+                return fp
+
+        # Hash outside the lock, like loads
+        h = hashlib.blake2b(digest_size=16)
+        with p.open("rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        fp = h.hexdigest()
+        with self._lock:
+            self._fingerprints[key] = fp
+            while len(self._fingerprints) > self.max_fingerprints:
+                self._fingerprints.popitem(last=False)
+        return fp
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], pd.DataFrame], pin: bool = False) -> pd.DataFrame:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if pin:
+                    self._pins[key] = self._pins.get(key, 0) + 1
+                return entry[0]
+            self.misses += 1
+
+        # Parse outside the lock so loading one dataset never blocks readers of another
+        df = loader()
+        size = int(df.memory_usage(deep=True).sum())
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (df, size)
+                self._total_bytes += size
+            self._entries.move_to_end(key)
+            if pin:
+                self._pins[key] = self._pins.get(key, 0) + 1
+            self._evict(keep=key)
+            return self._entries[key][0]
+
+    def release(self, key: Hashable):
+        """Drop one pin on `key`; once unpinned the entry is evictable again."""
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+            self._evict(keep=None)
+
+    def _evict(self, keep: Hashable):
+        # The entry just requested and pinned entries are always kept, even over budget
+        for key in list(self._entries):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if key == keep or key in self._pins:
+                continue
+            _, size = self._entries.pop(key)
+            self._total_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "pinned": len(self._pins),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+DATASET_CACHE = DatasetCache(max_bytes=DATASET_CACHE_MAX_BYTES)
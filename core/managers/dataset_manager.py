@@ -1,35 +1,138 @@
 from pathlib import Path
+from threading import Lock
 import pandas as pd
-from typing import Optional
+from typing import List, Optional
+from core.executor.sql_source import DuckDBSource
+from core.managers.dataset_cache import DATASET_CACHE
+from core.managers.profile import PROFILE_CACHE, DatasetProfile
+from core.managers.shared_store import SHARED_STORE
+from core.managers.ingestion import MemoryReport, columnar_path, is_columnar_fresh, read_columnar, read_source, write_columnar
+
+SUPPORTED_EXTENSIONS = [".csv", ".json", ".parquet", ".xls", ".xlsx"]
 
 class DatasetManager:
-    def __init__(self):
+    def __init__(self, pin: bool = False):
         self.df: Optional[pd.DataFrame] = None
         self.path: Optional[Path] = None
+        self.fingerprint: Optional[str] = None
+        self.memory_report: Optional[MemoryReport] = None
+        # A pinning manager keeps its current dataset in DATASET_CACHE until `release`
+        self.pin = pin
+        self._pinned: Optional[str] = None
+        # Set by `attach`, when the dataset is only open through DuckDB
+        self._profile: Optional[DatasetProfile] = None
+        self._frame_lock = Lock()
 
-    def load(self, path: str) -> pd.DataFrame:
+    def load(self, path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load a dataset, converting it to its columnar sidecar on first access.
+        `columns` restricts the read to a subset of columns.
+        """
         p = Path(path)
         ext = p.suffix.lower()
-        if ext == ".csv":
-            df = pd.read_csv(p)
-        elif ext in [".json"]:
-            df = pd.read_json(p)
-        elif ext in [".parquet"]:
-            df = pd.read_parquet(p)
-        elif ext in [".xls", ".xlsx"]:
-            df = pd.read_excel(p)
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Unsupported extension {ext}")
+
+        if columns is None:
+            self.memory_report = None
+        fingerprint = DATASET_CACHE.fingerprint(p)
+        if columns is None:
+            df = DATASET_CACHE.get_or_load(fingerprint, lambda: self._read_shared(p, fingerprint), pin=self.pin)
         else:
+            df = DATASET_CACHE.get_or_load((fingerprint, tuple(columns)), lambda: self._read(p, fingerprint, columns))
+
+        if columns is None:
+            if self.pin:
+                # The new dataset is pinned before the previous one is let go
+                self.release()
+                self._pinned = fingerprint
+            self.df = df
+            self.path = p
+            self.fingerprint = fingerprint
+            self._profile = None
+            PROFILE_CACHE.get(df, fingerprint)
+        return df
+
+    def attach(self, path: str, memory_limit: Optional[str] = None) -> DuckDBSource:
+        """
+        Open a dataset for the duckdb backend without keeping it in pandas: the file is
+        converted once to its columnar sidecar (the same one pandas loads read) and profiled
+        by DuckDB, and `df` stays None until `frame()` is needed. The caller owns (and
+        closes) the returned source.
+        """
+        p = Path(path)
+        ext = p.suffix.lower()
+        if ext not in SUPPORTED_EXTENSIONS:
             raise ValueError(f"Unsupported extension {ext}")
-        
-        self.df = df
+
+        self.memory_report = None
+        fingerprint = DATASET_CACHE.fingerprint(p)
+        source = DuckDBSource(self.ingest(p, fingerprint), memory_limit=memory_limit)
+        try:
+            profile = PROFILE_CACHE.get_source(source, fingerprint)
+        except Exception:
+            source.close()
+            raise
+        self.release()
+        self.df = None
         self.path = p
-        return df
+        self.fingerprint = fingerprint
+        self._profile = profile
+        return source
+
+    def frame(self) -> Optional[pd.DataFrame]:
+        """The current dataset in pandas, loaded on first use when it was only attached."""
+        with self._frame_lock:
+            if self.df is None and self.path is not None:
+                self.load(self.path)
+        return self.df
+
+    @property
+    def columns(self) -> List[str]:
+        profile = self.profile
+        return list(profile.columns) if profile is not None else []
+
+    def release(self):
+        """Unpin the current dataset; it stays cached until evicted."""
+        if self._pinned is not None:
+            DATASET_CACHE.release(self._pinned)
+            self._pinned = None
+
+    @property
+    def profile(self) -> Optional[DatasetProfile]:
+        if self.df is None:
+            return self._profile
+        return PROFILE_CACHE.get(self.df, self.fingerprint)
+
+    def ingest(self, path: str, fingerprint: Optional[str] = None) -> Path:
+        """
+        Convert the file into a Parquet sidecar once per content, so later loads (by
+        either backend) never re-parse text. Returns the path later loads will read from.
+        """
+        p = Path(path)
+        fingerprint = fingerprint or DATASET_CACHE.fingerprint(p)
+        if is_columnar_fresh(p, fingerprint):
+            return columnar_path(p, fingerprint)
+        df, self.memory_report = read_source(p)
+        return write_columnar(df, p, fingerprint) or p
+
+    def _read(self, p: Path, fingerprint: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if is_columnar_fresh(p, fingerprint):
+            return read_columnar(p, fingerprint, columns)
+        df, self.memory_report = read_source(p)
+        write_columnar(df, p, fingerprint)
+        return df[columns] if columns is not None else df
+
+    def _read_shared(self, p: Path, fingerprint: str) -> pd.DataFrame:
+        if SHARED_STORE is None:
+            return self._read(p, fingerprint)
+        df = SHARED_STORE.load(fingerprint)
+        if df is not None:
+            return df
+        return SHARED_STORE.publish(fingerprint, self._read(p, fingerprint))
 
     def basic_stats_text(self) -> str:
-        df = self.df
-        if df is None:
+        profile = self.profile
+        if profile is None:
             return ""
-        lines = [f"Dataset with {len(df)} rows and {len(df.columns)} columns."]
-        for c in df.columns:
-            lines.append(f"- {c}: {str(df[c].dtype)}, missing={int(df[c].isna().sum())}")
-        return "\n".join(lines)
\ No newline at end of file
+        return profile.summary_text()
@@ -1,47 +1,144 @@
-from llama_index.core import Document, VectorStoreIndex, StorageContext
-from llama_index.vector_stores.chroma import ChromaVectorStore
-import chromadb
-from config import EMBEDDING_MODEL, EMBEDDINGS_PATH
+import hashlib
+from threading import Lock
+from typing import Any, Dict, List, Optional
+from config import EMBEDDINGS_PATH, INDEX_BACKEND, get_embedding_model
+from core.managers.profile import PROFILE_CACHE, DatasetProfile
+from core.retriever.numpy_index import NumpyVectorIndex
+
+PROFILE_SOURCE = "profile" # metadata marking the documents generated from a dataset profile
+
+_chroma_client = None
+_chroma_lock = Lock()
+
+
+def get_chroma_client():
+    """One persistent Chroma client shared by every session in the process."""
+    global _chroma_client
+    if _chroma_client is None:
+        with _chroma_lock:
+            if _chroma_client is None:
+                import chromadb
+                _chroma_client = chromadb.PersistentClient(path=str(EMBEDDINGS_PATH.resolve()))
+    return _chroma_client
+
+
+def collection_name_for(fingerprint: str) -> str:
+    return f"ds_{fingerprint}"
+
 
 class IndexManager:
-    def __init__(self, collection_name="quickstart", embeddings_model=EMBEDDING_MODEL):
-        self.embeddings_model = embeddings_model
+    """
+    One Chroma collection per dataset fingerprint. Documents are identified by a hash
+    of their content, so rebuilding only embeds new or changed columns and a dataset
+    indexed before (even by another session or before a restart) is reused as is.
+
+    With the "numpy" backend the same documents go to an in-process NumpyVectorIndex
+    whose vectors are persisted per fingerprint under EMBEDDINGS_PATH instead.
+
+    llama_index, chromadb and the embedding model are only loaded when the index is
+    first built, so creating the manager is cheap.
+    """
+
+    def __init__(self, collection_name: Optional[str] = None, embeddings_model=None, backend: str = INDEX_BACKEND):
+        if backend not in ("chroma", "numpy"):
+            raise ValueError(f"Unknown index backend '{backend}'")
+        self.backend = backend
+        self._embeddings_model = embeddings_model
+        # A fixed collection name overrides the per-dataset collections
         self.collection_name = collection_name
-        self.chroma_client = chromadb.PersistentClient(path=str(EMBEDDINGS_PATH.resolve()))
-        try:
-            self.collection = self.chroma_client.get_collection(collection_name)
-        except Exception:
-            self.collection = self.chroma_client.create_collection(collection_name)
-        self.vector_store = ChromaVectorStore(chroma_collection=self.collection)
-        self.index: VectorStoreIndex = None
+        self.fingerprint: Optional[str] = None
+        self.collection = None
+        self.vector_store = None
+        self.index = None
 
-    def _df_to_documents(self, df):
+    @property
+    def embeddings_model(self):
+        if self._embeddings_model is None:
+            self._embeddings_model = get_embedding_model()
+        return self._embeddings_model
+
+    @staticmethod
+    def node_id(text: str, metadata: dict) -> str:
+        payload = text + "\x00" + repr(sorted(metadata.items()))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _df_to_documents(self, df, profile: DatasetProfile = None):
         """
-        Convert dataframe columns into a list of llama_index.Document to be indexed.
-        Each doc corresponds to a column with basic stats and a small sample.
+        Convert dataframe columns into a list of llama_index nodes to be indexed.
+        Each node corresponds to a column with basic stats and a small sample, and its
+        id is the hash of its content.
         """
+        from llama_index.core.schema import TextNode
+        profile = profile or PROFILE_CACHE.get(df)
         docs = []
-        for col in df.columns:
-            s = df[col]
-            
+        for col, c in profile.columns.items():
             text = (
                 f"Column: {col}\n"
-                f"Type: {s.dtype}\n"
-                f"N_missing: {int(s.isna().sum())}\n"
-                f"Sample: {s.dropna().head(10).tolist()}\n"
-                f"Stats:\n{s.describe(include='all').to_string()}"
+                f"Type: {c.dtype}\n"
+                f"N_missing: {c.n_missing}\n"
+                f"Sample: {c.sample}\n"
+                f"Stats:\n{c.stats_text()}"
             )
-            docs.append(Document(text=text, extra_info={"column": col}))
+            metadata = {"column": str(col), "source": PROFILE_SOURCE}
+            docs.append(TextNode(id_=self.node_id(text, metadata), text=text, metadata=metadata))
         # top-level dataset doc
-        docs.append(Document(text=f"Dataset summary: {len(df)} rows, {len(df.columns)} columns"))
+        text = f"Dataset summary: {profile.n_rows} rows, {profile.n_cols} columns"
+        metadata = {"source": PROFILE_SOURCE}
+        docs.append(TextNode(id_=self.node_id(text, metadata), text=text, metadata=metadata))
         return docs
 
-    def build_index(self, df):
-        docs = self._df_to_documents(df)
-        storage_context = StorageContext.from_defaults(vector_store=self.vector_store)
-        self.index = VectorStoreIndex.from_documents(docs, storage_context=storage_context, embed_model=self.embeddings_model)
+    def _open(self, name: str):
+        from llama_index.core import VectorStoreIndex
+        from llama_index.vector_stores.chroma import ChromaVectorStore
+        self.collection = get_chroma_client().get_or_create_collection(name)
+        self.vector_store = ChromaVectorStore(chroma_collection=self.collection)
+        self.index = VectorStoreIndex.from_vector_store(self.vector_store, embed_model=self.embeddings_model)
+
+    def build_index(self, df, profile: DatasetProfile = None, fingerprint: Optional[str] = None):
+        profile = profile or PROFILE_CACHE.get(df)
+        fingerprint = fingerprint or profile.fingerprint
+        name = self.collection_name or (collection_name_for(fingerprint) if fingerprint else "quickstart")
+        nodes = self._df_to_documents(df, profile)
+
+        if self.backend == "numpy":
+            index = NumpyVectorIndex(self.embeddings_model, EMBEDDINGS_PATH / "numpy" / f"{name}.npz")
+            # As with chroma, only profile documents are replaced; feedback documents are kept
+            embedded = index.build(
+                [n.node_id for n in nodes], [n.text for n in nodes], [n.metadata for n in nodes],
+                keep=lambda metadata: metadata.get("source") != PROFILE_SOURCE,
+            )
+            self.index, self.fingerprint = index, fingerprint
+            print(f"[INDEX] {name}: {embedded} embedded, {len(nodes) - embedded} reused")
+            return self.index
+
+        self._open(name)
+        self.fingerprint = fingerprint
+
+        wanted = {n.node_id for n in nodes}
+        stored = self.collection.get(include=["metadatas"])
+        existing = set(stored["ids"])
+        # Only profile documents are replaced; feedback documents stay with the dataset
+        stale = [
+            i for i, meta in zip(stored["ids"], stored["metadatas"] or [{}] * len(stored["ids"]))
+            if i not in wanted and (meta or {}).get("source") == PROFILE_SOURCE
+        ]
+        if stale:
+            self.collection.delete(ids=stale)
+        new = [n for n in nodes if n.node_id not in existing]
+        if new:
+            self.index.insert_nodes(new)
+        print(f"[INDEX] {name}: {len(new)} embedded, {len(nodes) - len(new)} reused, {len(stale)} removed")
         return self.index
 
+    def query(self, text: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """Top-k documents for `text` as {text, metadata, score}; pure vector search, no LLM call."""
+        if not self.index:
+            return []
+        if self.backend == "numpy":
+            return self.index.query(text, top_k)
+        hits = self.index.as_retriever(similarity_top_k=top_k).retrieve(text)
+        return [{"text": h.node.get_content(), "metadata": h.node.metadata, "score": h.score} for h in hits]
+
     def add_feedback_doc(self, text: str, metadata: dict):
         """
         Add a user correction as a new document in the index.
@@ -49,7 +146,12 @@ class IndexManager:
         """
         if not self.index:
             raise RuntimeError("Index has not been built yet. Build index before adding feedback.")
+        metadata = metadata or {"source": "user_feedback"}
+        if self.backend == "numpy":
+            self.index.add(self.node_id(text, metadata), text, metadata)
+            return text
+        from llama_index.core import Document
 
-        doc = Document(text=text, extra_info=metadata or {"source": "user_feedback"})
+        doc = Document(text=text, extra_info=metadata)
         self.index.insert(doc)
-        return doc
\ No newline at end of file
+        return doc
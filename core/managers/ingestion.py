@@ -0,0 +1,211 @@
+import glob
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from pandas.tseries.api import guess_datetime_format
+from config import CSV_CHUNK_SIZE, CSV_INGEST_MODE
+
+COLUMNAR_SUFFIX = ".parquet"
+CATEGORY_MAX_RATIO = 0.5  # object columns with unique/non-null below this ratio become categoricals
+DATE_SAMPLE_SIZE = 200
+
+
+@dataclass
+class MemoryReport:
+    rows: int
+    before_bytes: int
+    after_bytes: int
+    dtypes: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ratio(self) -> float:
+        return self.before_bytes / self.after_bytes if self.after_bytes else 1.0
+
+    def __str__(self) -> str:
+        mb = 1024 * 1024
+        return (
+            f"{self.rows} rows: {self.before_bytes / mb:.1f} MB -> {self.after_bytes / mb:.1f} MB "
+            f"({self.ratio:.1f}x smaller)"
+        )
+
+
+def columnar_path(path: Path, fingerprint: str) -> Path:
+    """
+    Location of the Parquet sidecar written next to an uploaded file. It is keyed by the
+    content fingerprint, so rewriting the upload with the same bytes keeps it valid.
+    """
+    if path.suffix.lower() == COLUMNAR_SUFFIX:
+        return path
+    return path.with_name(f"{path.name}.{fingerprint}{COLUMNAR_SUFFIX}")
+
+
+def is_columnar_fresh(path: Path, fingerprint: str) -> bool:
+    return columnar_path(path, fingerprint).exists()
+
+
+def read_source(path: Path) -> Tuple[pd.DataFrame, Optional[MemoryReport]]:
+    """
+    Parse the original upload according to its extension.
+    CSV files are streamed through `read_csv_optimized` unless CSV_INGEST_MODE is "plain".
+    """
+    ext = path.suffix.lower()
+    if ext == ".csv":
+        if CSV_INGEST_MODE == "optimized":
+            return read_csv_optimized(path)
+        return pd.read_csv(path), None
+    elif ext in [".json"]:
+        return pd.read_json(path), None
+    elif ext in [".parquet"]:
+        return pd.read_parquet(path), None
+    elif ext in [".xls", ".xlsx"]:
+        return pd.read_excel(path), None
+    raise ValueError(f"Unsupported extension {ext}")
+
+
+class _DateColumnMismatch(Exception):
+    def __init__(self, column: str):
+        self.column = column
+
+
+def _infer_plan(chunk: pd.DataFrame) -> Tuple[Dict[str, str], List[str]]:
+    """Decide on the first chunk which object columns hold dates (and their format) or categories."""
+    date_formats: Dict[str, str] = {}
+    categories: List[str] = []
+    for col in chunk.select_dtypes(include=["object"]).columns:
+        values = chunk[col].dropna()
+        if values.empty:
+            continue
+        sample = values.head(DATE_SAMPLE_SIZE)
+        fmt = guess_datetime_format(str(sample.iloc[0]))
+        if fmt is not None and pd.to_datetime(sample, format=fmt, errors="coerce").notna().all():
+            date_formats[col] = fmt
+        elif values.nunique() <= CATEGORY_MAX_RATIO * len(values):
+            categories.append(col)
+    return date_formats, categories
+
+
+def _downcast_numeric(df: pd.DataFrame) -> pd.DataFrame:
+    for col in df.select_dtypes(include=["integer"]).columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    for col in df.select_dtypes(include=["floating"]).columns:
+        values = df[col].to_numpy()
+        downcast = values.astype(np.float32)
+        # Only keep float32 when every value round-trips exactly, so results never drift
+        if np.array_equal(downcast.astype(values.dtype), values, equal_nan=True):
+            df[col] = downcast
+    return df
+
+
+def _optimize_chunk(chunk: pd.DataFrame, date_formats: Dict[str, str], categories: List[str]) -> pd.DataFrame:
+    for col, fmt in date_formats.items():
+        parsed = pd.to_datetime(chunk[col], format=fmt, errors="coerce")
+        if parsed.isna().sum() > chunk[col].isna().sum():
+            raise _DateColumnMismatch(col)
+        chunk[col] = parsed
+    for col in categories:
+        chunk[col] = chunk[col].astype("category")
+    return _downcast_numeric(chunk)
+
+
+def _combine(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [c[col] for c in chunks]
+        for c in chunks:
+            del c[col]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            try:
+                columns[col] = pd.Series(union_categoricals(parts, ignore_order=True), name=col)
+                continue
+            except TypeError:
+                parts = [p.astype(object) for p in parts]
+        columns[col] = pd.concat(parts, ignore_index=True)
+    # Chunks may disagree on widths (e.g. an int column gaining NaNs later), so downcast once more
+    return _downcast_numeric(pd.DataFrame(columns))
+
+
+def _order_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make categoricals ordered with sorted categories, so comparisons (`city > "a"`), sorting
+    and group order behave as they do on the plain strings, whatever the chunk merge order.
+    """
+    for col in df.select_dtypes(include="category").columns:
+        try:
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories), ordered=True)
+        except TypeError:
+            # Mixed-type categories have no string order: keep the column as plain values
+            df[col] = df[col].astype(object)
+    return df
+
+
+def read_csv_optimized(path: Path, chunksize: int = CSV_CHUNK_SIZE) -> Tuple[pd.DataFrame, MemoryReport]:
+    """
+    Stream a CSV in chunks, converting each chunk to compact dtypes before the next is read:
+    low-cardinality strings become (ordered) categoricals, numbers are downcast and date
+    columns are parsed once with a format inferred on the first chunk.
+    """
+    excluded_dates: List[str] = []
+    while True:
+        chunks: List[pd.DataFrame] = []
+        before = 0
+        date_formats: Dict[str, str] = {}
+        categories: List[str] = []
+        try:
+            for i, chunk in enumerate(pd.read_csv(path, chunksize=chunksize, low_memory=False)):
+                before += int(chunk.memory_usage(deep=True).sum())
+                if i == 0:
+                    date_formats, categories = _infer_plan(chunk)
+                    for col in excluded_dates:
+                        date_formats.pop(col, None)
+                chunks.append(_optimize_chunk(chunk, date_formats, categories))
+        except _DateColumnMismatch as e:
+            # A later chunk disagrees with the inferred date format: re-read keeping the column as text
+            excluded_dates.append(e.column)
+            continue
+        break
+
+    df = _order_categories(_combine(chunks)) if chunks else pd.read_csv(path)
+    after = int(df.memory_usage(deep=True).sum())
+    report = MemoryReport(
+        rows=len(df),
+        before_bytes=before,
+        after_bytes=after,
+        dtypes={str(c): str(t) for c, t in df.dtypes.items()},
+    )
+    print(f"[INGESTION] {path.name}: {report}")
+    return df, report
+
+
+def write_columnar(df: pd.DataFrame, path: Path, fingerprint: str) -> Optional[Path]:
+    """
+    Persist `df` as the Parquet sidecar of `path`, removing sidecars of its earlier contents.
+    This is the only writer of sidecars, so their dtypes never depend on which backend
+    opened the file first. Returns None when the frame cannot be represented in Parquet
+    (e.g. mixed-type object columns); callers then keep parsing the original file.
+    """
+    sidecar = columnar_path(path, fingerprint)
+    if sidecar == path:
+        return sidecar
+    tmp = sidecar.with_name(sidecar.name + ".tmp")
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, sidecar)
+        for stale in path.parent.glob(f"{glob.escape(path.name)}.*{COLUMNAR_SUFFIX}"):
+            if stale != sidecar:
+                stale.unlink(missing_ok=True)
+        return sidecar
+    except Exception as e:
+        print(f"[INGESTION] Could not write columnar copy of {path.name}: {e}")
+        tmp.unlink(missing_ok=True)
+        return None
+
+
+def read_columnar(path: Path, fingerprint: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Memory-map the Parquet sidecar, reading only the requested columns."""
+    return pd.read_parquet(columnar_path(path, fingerprint), columns=columns, memory_map=True)
@@ -0,0 +1,247 @@
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+from core.executor.sql_source import DuckDBSource, quote
+
+SAMPLE_ROWS = 1000
+SAMPLE_VALUES = 10
+MAX_PROFILES = 16
+
+
+DESCRIBE_ROWS = ["count", "unique", "top", "freq", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+def _describe_all(df: pd.DataFrame, numeric_columns: List[str]) -> pd.DataFrame:
+    """
+    Equivalent of `df.describe(include="all")`, with the numeric block reduced by
+    frame-wide reductions rather than one describe per column.
+    """
+    if not len(df.columns):
+        return pd.DataFrame()
+    parts = []
+    if numeric_columns:
+        num = df[numeric_columns]
+        quantiles = num.quantile([0.25, 0.5, 0.75])
+        quantiles.index = ["25%", "50%", "75%"]
+        parts.append(pd.concat([
+            num.count().to_frame("count").T.astype("float64"),
+            num.mean().to_frame("mean").T,
+            num.std().to_frame("std").T,
+            num.min().to_frame("min").T.astype("float64"),
+            quantiles,
+            num.max().to_frame("max").T.astype("float64"),
+        ]))
+    others = [c for c in df.columns if c not in set(numeric_columns)]
+    if others:
+        parts.append(df[others].describe(include="all"))
+    describe = pd.concat(parts, axis=1)
+    rows = [r for r in DESCRIBE_ROWS if r in describe.index]
+    return describe.reindex(index=rows, columns=df.columns)
+
+
+@dataclass
+class ColumnProfile:
+    name: str
+    dtype: str
+    is_numeric: bool
+    n_missing: int
+    sample: List[Any] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    def stats_text(self) -> str:
+        return pd.Series(self.stats, dtype="object").to_string()
+
+
+@dataclass
+class DatasetProfile:
+    n_rows: int
+    columns: Dict[str, ColumnProfile]
+    numeric_columns: List[str]
+    describe: pd.DataFrame
+    fingerprint: Optional[str] = None
+
+    @property
+    def n_cols(self) -> int:
+        return len(self.columns)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, fingerprint: Optional[str] = None) -> "DatasetProfile":
+        """Profile every column with frame-level vectorized calls instead of per-column scans."""
+        numeric_columns = list(df.select_dtypes(include="number").columns)
+        numeric_set = set(numeric_columns)
+        missing = df.isna().sum()
+        describe = _describe_all(df, numeric_columns)
+        head = df.head(SAMPLE_ROWS)
+
+        columns = {}
+        for col in df.columns:
+            stats = describe[col].dropna().to_dict() if col in describe.columns else {}
+            columns[col] = ColumnProfile(
+                name=col,
+                dtype=str(df[col].dtype),
+                is_numeric=col in numeric_set,
+                n_missing=int(missing[col]),
+                sample=head[col].dropna().head(SAMPLE_VALUES).tolist(),
+                stats=stats,
+            )
+        return cls(
+            n_rows=len(df),
+            columns=columns,
+            numeric_columns=numeric_columns,
+            describe=describe,
+            fingerprint=fingerprint,
+        )
+
+    @classmethod
+    def from_source(cls, source: DuckDBSource, fingerprint: Optional[str] = None) -> "DatasetProfile":
+        """
+        Same profile computed by DuckDB over the columnar file, so the duckdb backend never
+        loads the dataset into pandas: one aggregate scan, plus one per text column for its
+        most frequent value.
+        """
+        columns = source.columns
+        numeric_columns = source.numeric_columns
+        numeric_set = set(numeric_columns)
+        exprs = ["count(*)"]
+        for col in columns:
+            c = quote(col)
+            if col in numeric_set:
+                exprs += [
+                    f"count({c})", f"avg({c})", f"stddev_samp({c})", f"min({c})",
+                    f"quantile_cont({c}, 0.25)", f"quantile_cont({c}, 0.5)", f"quantile_cont({c}, 0.75)",
+                    f"max({c})",
+                ]
+            elif source.is_temporal(col):
+                exprs += [
+                    f"count({c})", f"avg({c})", f"min({c})",
+                    f"quantile_cont({c}, 0.25)", f"quantile_cont({c}, 0.5)", f"quantile_cont({c}, 0.75)",
+                    f"max({c})",
+                ]
+            else:
+                exprs += [f"count({c})", f"count(DISTINCT {c})"]
+        row = list(source.query_row(f"SELECT {', '.join(exprs)} FROM data"))
+        n_rows = int(row.pop(0))
+
+        stats: Dict[str, Dict[str, Any]] = {}
+        for col in columns:
+            if col in numeric_set:
+                names = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+            elif source.is_temporal(col):
+                names = ["count", "mean", "min", "25%", "50%", "75%", "max"]
+            else:
+                names = ["count", "unique"]
+            values = [row.pop(0) for _ in names]
+            stats[col] = {
+                n: float(v) if col in numeric_set and v is not None else v
+                for n, v in zip(names, values)
+            }
+            if "unique" in stats[col] and stats[col]["count"]:
+                c = quote(col)
+                top, freq = source.query_row(
+                    f"SELECT {c}, count(*) AS n FROM data WHERE {c} IS NOT NULL "
+                    f"GROUP BY {c} ORDER BY n DESC LIMIT 1"
+                )
+                stats[col].update(top=top, freq=freq)
+
+        describe = pd.DataFrame(stats, columns=columns)
+        rows = [r for r in DESCRIBE_ROWS if r in describe.index]
+        describe = describe.reindex(index=rows, columns=columns)
+        head = source.query(f"SELECT * FROM data LIMIT {SAMPLE_ROWS}")
+
+        profiles = {}
+        for col in columns:
+            profiles[col] = ColumnProfile(
+                name=col,
+                dtype=str(head[col].dtype),
+                is_numeric=col in numeric_set,
+                n_missing=n_rows - int(stats[col]["count"]),
+                sample=head[col].dropna().head(SAMPLE_VALUES).tolist(),
+                stats=describe[col].dropna().to_dict(),
+            )
+        return cls(
+            n_rows=n_rows,
+            columns=profiles,
+            numeric_columns=numeric_columns,
+            describe=describe,
+            fingerprint=fingerprint,
+        )
+
+    def summary_text(self) -> str:
+        lines = [f"Dataset with {self.n_rows} rows and {self.n_cols} columns."]
+        for c in self.columns.values():
+            lines.append(f"- {c.name}: {c.dtype}, missing={c.n_missing}")
+        return "\n".join(lines)
+
+
+class ProfileCache:
+    """
+    Profiles cached by dataset fingerprint, plus a weak lookup from the loaded
+    DataFrame object so strategies and the visualizer can reuse the profile of
+    the frame they were handed without recomputing it.
+    """
+
+    def __init__(self, max_profiles: int = MAX_PROFILES):
+        self.max_profiles = max_profiles
+        self._by_fingerprint: "OrderedDict[str, DatasetProfile]" = OrderedDict()
+        self._by_frame: Dict[int, Tuple[weakref.ref, DatasetProfile]] = {}
+        self._lock = Lock()
+
+    def get(self, df: pd.DataFrame, fingerprint: Optional[str] = None) -> DatasetProfile:
+        profile = self.lookup(df)
+        if profile is not None:
+            return profile
+        with self._lock:
+            profile = self._by_fingerprint.get(fingerprint) if fingerprint else None
+        if profile is None or profile.n_rows != len(df) or list(profile.columns) != list(df.columns):
+            profile = DatasetProfile.from_frame(df, fingerprint)
+        self._register(df, profile)
+        return profile
+
+    def get_source(self, source: DuckDBSource, fingerprint: Optional[str] = None) -> DatasetProfile:
+        """Profile of a dataset opened through DuckDB, computed without a pandas frame."""
+        with self._lock:
+            profile = self._by_fingerprint.get(fingerprint) if fingerprint else None
+        if profile is None or profile.n_rows != source.n_rows or list(profile.columns) != source.columns:
+            profile = DatasetProfile.from_source(source, fingerprint)
+            self._remember(profile)
+        return profile
+
+    def lookup(self, df: pd.DataFrame) -> Optional[DatasetProfile]:
+        entry = self._by_frame.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        return None
+
+    def _register(self, df: pd.DataFrame, profile: DatasetProfile):
+        key = id(df)
+        with self._lock:
+            self._by_frame[key] = (weakref.ref(df, lambda _: self._by_frame.pop(key, None)), profile)
+        self._remember(profile)
+
+    def _remember(self, profile: DatasetProfile):
+        if not profile.fingerprint:
+            return
+        with self._lock:
+            self._by_fingerprint[profile.fingerprint] = profile
+            self._by_fingerprint.move_to_end(profile.fingerprint)
+            while len(self._by_fingerprint) > self.max_profiles:
+                self._by_fingerprint.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._by_fingerprint.clear()
+            self._by_frame.clear()
+
+
+PROFILE_CACHE = ProfileCache()
+
+
+def numeric_columns(df: pd.DataFrame) -> List[str]:
+    """Numeric column names, read from the cached profile when `df` is a loaded dataset."""
+    profile = PROFILE_CACHE.lookup(df)
+    if profile is not None:
+        return profile.numeric_columns
+    return list(df.select_dtypes(include="number").columns)
@@ -0,0 +1,92 @@
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+import pandas as pd
+from config import SHARED_DATASET_DIR, SHARED_DATASET_MAX_BYTES
+
+
+class SharedArrowStore:
+    """
+    Read-only datasets published as Arrow IPC files in a shared-memory directory
+    (e.g. /dev/shm) and memory-mapped by every process that loads them.
+
+    Null-free numeric, boolean and datetime columns are exposed to pandas without a
+    copy, so worker processes serving the same dataset share those pages instead of
+    each parsing a private copy; other columns are materialized per process. The
+    resulting arrays are read-only, which is how the agent treats datasets anyway.
+
+    Files beyond `max_bytes` are removed oldest first; a process that still maps a
+    removed file keeps its pages until it drops the DataFrame.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+
+    def path_for(self, fingerprint: str) -> Path:
+        return self.root / f"{fingerprint}.arrow"
+
+    def load(self, fingerprint: str) -> Optional[pd.DataFrame]:
+        path = self.path_for(fingerprint)
+        if not path.exists():
+            return None
+        try:
+            import pyarrow as pa
+            import pyarrow.ipc as ipc
+            table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+            os.utime(path)  # recency for eviction
+            return table.to_pandas(split_blocks=True)
+        except Exception as e:
+            print(f"[SHARED STORE] ignoring unreadable {path}: {e}")
+            return None
+
+    def publish(self, fingerprint: str, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Write `df` to the store and return the memory-mapped copy, so this process
+        also drops its private buffers. Returns `df` unchanged if it cannot be shared.
+        """
+        path = self.path_for(fingerprint)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            import pyarrow as pa
+            import pyarrow.ipc as ipc
+            table = pa.Table.from_pandas(df)
+            self.root.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                self._evict(table.nbytes)
+            with ipc.new_file(str(tmp), table.schema) as writer:
+                writer.write_table(table)
+            # Atomic: a concurrent reader sees either no file or a complete one
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"[SHARED STORE] not sharing {fingerprint}: {e}")
+            tmp.unlink(missing_ok=True)
+            return df
+        shared = self.load(fingerprint)
+        return shared if shared is not None else df
+
+    def _evict(self, incoming: int):
+        files = []
+        for f in self.root.glob("*.arrow"):
+            try:
+                st = f.stat()
+            except FileNotFoundError:  # removed by another process meanwhile
+                continue
+            files.append((st.st_mtime, st.st_size, f))
+        total = sum(size for _, size, _ in files) + incoming
+        for _, size, f in sorted(files):
+            if total <= self.max_bytes:
+                break
+            total -= size
+            f.unlink(missing_ok=True)
+
+    def clear(self):
+        for f in self.root.glob("*.arrow"):
+            f.unlink(missing_ok=True)
+
+
+SHARED_STORE: Optional[SharedArrowStore] = (
+    SharedArrowStore(SHARED_DATASET_DIR, SHARED_DATASET_MAX_BYTES) if SHARED_DATASET_DIR else None
+)
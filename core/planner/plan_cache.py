@@ -0,0 +1,177 @@
+import copy
+import hashlib
+import json
+import re
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from config import PLAN_CACHE_THRESHOLD, PLAN_CACHE_MAX_ENTRIES, get_embedding_model
+
+COLUMN_KEYS = ("by", "target", "column", "x", "y", "date_column", "value_column")
+# Keys whose string values come from the planner's vocabulary, not from the question
+STRUCTURAL_KEYS = ("type", "name", "operator", "agg", "freq", "method", "style", "text", "source")
+
+# Words that flip a plan while barely moving the embedding ("top 5" vs "bottom 5"),
+# mapped to the direction or comparison they express
+DIRECTION_WORDS = {
+    **dict.fromkeys(
+        ("top", "highest", "largest", "biggest", "greatest", "most", "max", "maximum", "best", "descending"), "high"
+    ),
+    **dict.fromkeys(
+        ("bottom", "lowest", "smallest", "least", "fewest", "min", "minimum", "worst", "ascending"), "low"
+    ),
+    **dict.fromkeys(("more", "greater", "higher", "larger", "above", "over", "exceeding", "exceeds"), ">"),
+    **dict.fromkeys(("less", "fewer", "lower", "smaller", "below", "under"), "<"),
+    **dict.fromkeys(("not", "except", "excluding", "without"), "not"),
+}
+DIRECTION_PHRASES = {"at least": ">=", "at most": "<=", "no more than": "<=", "no less than": ">="}
+TOKEN_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?|[<>!=]=|[<>=]|[a-z]+")
+
+
+class PlanCache:
+    """
+    Semantic cache of planner outputs. Questions are embedded with the app's embedding
+    model; a stored plan for the same column schema is reused when the cosine similarity
+    reaches `threshold`, both questions carry the same numbers and direction words
+    (see `signature`), the new question mentions every string literal of the plan
+    (see `literals`), and every column it references still exists.
+    """
+
+    def __init__(self, embed_model=None, threshold: float = PLAN_CACHE_THRESHOLD, max_entries: int = PLAN_CACHE_MAX_ENTRIES):
+        self._embed_model = embed_model
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries: Dict[str, List[Tuple[str, np.ndarray, Dict, Tuple, Tuple[str, ...]]]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def schema_key(columns: list) -> str:
+        return hashlib.sha1(json.dumps([str(c) for c in columns]).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def referenced_columns(plan: Dict) -> List[Any]:
+        refs = []
+        for action in plan.get("actions", []):
+            for scope in (action, action.get("params") or {}):
+                if not isinstance(scope, dict):
+                    continue
+                refs += [scope[k] for k in COLUMN_KEYS if scope.get(k) is not None]
+                if isinstance(scope.get("columns"), list):
+                    refs += scope["columns"]
+        return refs
+
+    @staticmethod
+    def signature(question: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """The numeric literals and comparison/direction words of a question, normalized."""
+        text = question.lower()
+        directions = []
+        for phrase, token in DIRECTION_PHRASES.items():
+            if phrase in text:
+                directions.append(token)
+                text = text.replace(phrase, " ")
+        numbers = []
+        for token in TOKEN_PATTERN.findall(text):
+            if token[0].isdigit():
+                numbers.append(repr(float(token.replace(",", ""))))
+            elif token[0].isalpha():
+                if token in DIRECTION_WORDS:
+                    directions.append(DIRECTION_WORDS[token])
+            else:
+                directions.append("=" if token == "==" else token)
+        return tuple(sorted(numbers)), tuple(sorted(set(directions)))
+
+    @staticmethod
+    def literals(plan: Dict) -> Tuple[str, ...]:
+        """
+        The string values a plan filters or compares on ("London" in a filter), lowercased.
+        Entities barely move the embedding, so a plan is only reused for a question
+        that names all of them.
+        """
+        values = []
+        for action in plan.get("actions", []):
+            if action.get("type") == "answer":
+                continue
+            for scope in (action, action.get("params") or {}):
+                if not isinstance(scope, dict):
+                    continue
+                for key, value in scope.items():
+                    if key in COLUMN_KEYS or key in STRUCTURAL_KEYS or key == "columns":
+                        continue
+                    for item in value if isinstance(value, list) else [value]:
+                        if isinstance(item, str) and item.strip():
+                            values.append(item.strip().lower())
+        return tuple(sorted(set(values)))
+
+    @classmethod
+    def is_valid_for(cls, plan: Dict, columns: list) -> bool:
+        available = set(columns)
+        return all(ref in available for ref in cls.referenced_columns(plan))
+
+    @property
+    def embed_model(self):
+        if self._embed_model is None:
+            self._embed_model = get_embedding_model()
+        return self._embed_model
+
+    def _embed(self, question: str) -> np.ndarray:
+        vec = np.asarray(self.embed_model.get_query_embedding(question), dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup(self, question: str, columns: list) -> Optional[Dict]:
+        signature = self.signature(question)
+        normalized = question.strip().lower()
+        with self._lock:
+            # A snapshot, so `store` can evict concurrently
+            entries = [
+                e for e in self._entries.get(self.schema_key(columns), ())
+                if e[3] == signature and all(literal in normalized for literal in e[4])
+            ]
+        if not entries:
+            return self._miss()
+
+        best_plan, best_score = None, -1.0
+        for stored_question, _, plan, _, _ in entries:
+            if stored_question == normalized:
+                best_plan, best_score = plan, 1.0
+                break
+        if best_plan is None:
+            scores = np.stack([e[1] for e in entries]) @ self._embed(question)
+            best = int(np.argmax(scores))
+            best_plan, best_score = entries[best][2], float(scores[best])
+
+        if best_score >= self.threshold and self.is_valid_for(best_plan, columns):
+            with self._lock:
+                self.hits += 1
+            print(f"[PLAN CACHE] hit (similarity={best_score:.3f})")
+            return copy.deepcopy(best_plan)
+        return self._miss()
+
+    def _miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, question: str, columns: list, plan: Dict):
+        if not self.is_valid_for(plan, columns):
+            return
+        entry = (
+            question.strip().lower(), self._embed(question), copy.deepcopy(plan),
+            self.signature(question), self.literals(plan),
+        )
+        with self._lock:
+            entries = self._entries.setdefault(self.schema_key(columns), [])
+            entries.append(entry)
+            if len(entries) > self.max_entries:
+                del entries[0]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "schemas": len(self._entries),
+                "entries": sum(len(e) for e in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
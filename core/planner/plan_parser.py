@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, List, Optional
 import json
 
 
@@ -31,4 +31,61 @@ class PlanParser:
             raise ValueError(f"[ERROR] Parsed JSON is invalid or missing 'actions':\n{plan_json}")
 
         print("\n[DEBUG] PLAN OUTPUT:", plan)
-        return plan
\ No newline at end of file
+        return plan
+
+class IncrementalPlanParser:
+    """
+    Parse a plan while it streams in: each action object of the top-level JSON array
+    is returned as soon as its closing brace arrives. Accepts both a bare array and
+    {"actions": [...]}; markdown fences and surrounding prose are ignored.
+    """
+
+    def __init__(self):
+        self.raw = ""
+        self._pos = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None
+        self._object_start = None
+
+    def feed(self, text: str) -> List[Dict]:
+        self.raw += text
+        actions = []
+        while self._pos < len(self.raw):
+            ch = self.raw[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._stack:
+                self._in_string = True
+            elif ch in "[{":
+                self._stack.append(ch)
+                if ch == "[" and self._array_depth is None:
+                    self._array_depth = len(self._stack)
+                elif ch == "{" and self._array_depth is not None and len(self._stack) == self._array_depth + 1:
+                    self._object_start = self._pos
+            elif ch in "]}" and self._stack:
+                if ch == "}" and self._object_start is not None and len(self._stack) == self._array_depth + 1:
+                    action = self._decode(self.raw[self._object_start:self._pos + 1])
+                    if action is not None:
+                        actions.append(action)
+                    self._object_start = None
+                self._stack.pop()
+            self._pos += 1
+        return actions
+
+    @staticmethod
+    def _decode(text: str) -> Optional[Dict]:
+        for candidate in (text, text.replace('{{', '{').replace('}}', '}')):
+            try:
+                value = json.loads(candidate)
+                return value if isinstance(value, dict) else None
+            except json.JSONDecodeError:
+                continue
+        print(f"[WARNING] Skipping unparseable streamed action: {text}")
+        return None
@@ -1,16 +1,47 @@
-from typing import Dict
+from typing import Dict, Iterator, Optional
 from core.llm import LLM
-from core.planner.plan_parser import PlanParser
+from core.planner.plan_cache import PlanCache
+from core.planner.plan_parser import IncrementalPlanParser, PlanParser
 from core.interfaces.iplanner import IPlanner
-from core.prompts import PLANNER_PROMPT
-from config import LLMODEL
+from core.tracing import TRACER
+from config import get_llm
 
 class Planner(IPlanner):
-    def __init__(self, llm_client: LLM = LLMODEL):
-        self.llm = llm_client
+    def __init__(self, llm_client: Optional[LLM] = None, plan_cache: Optional[PlanCache] = None):
+        self._llm = llm_client
+        self.plan_cache = plan_cache
 
-    def plan(self, question: str, dataset_summary: str, columns: list, context: str = None) -> Dict:
+    @property
+    def llm(self) -> LLM:
+        if self._llm is None:
+            self._llm = get_llm()
+        return self._llm
+
+    def _cached_plan(self, question: str, columns: list, parent=None) -> Optional[Dict]:
+        if self.plan_cache is None:
+            return None
+        with TRACER.span("plan_cache", parent) as span:
+            try:
+                plan = self.plan_cache.lookup(question, columns)
+            except Exception as e:
+                print(f"[PLAN CACHE] lookup failed: {e}")
+                span.fail(str(e))
+                return None
+            span.set(cache_hit=plan is not None)
+            return plan
+
+    def _store_plan(self, question: str, columns: list, plan: Dict):
+        if self.plan_cache is None:
+            return
+        try:
+            self.plan_cache.store(question, columns, plan)
+        except Exception as e:
+            print(f"[PLAN CACHE] store failed: {e}")
 
+    @staticmethod
+    def _build_prompt(question: str, dataset_summary: str, columns: list, context: str = None) -> str:
+        # llama_index is only imported once a question is actually planned
+        from core.prompts import PLANNER_PROMPT
         prompt = PLANNER_PROMPT.format(
             question=question,
             summary=dataset_summary,
@@ -19,10 +50,65 @@ class Planner(IPlanner):
 
         if context:
             prompt += f"\n\n[Retrieved context from dataset]:\n{context}"
-        
+        return prompt
+
+    def plan(self, question: str, dataset_summary: str, columns: list, context: str = None) -> Dict:
+        with TRACER.span("plan") as span:
+            cached = self._cached_plan(question, columns)
+            if cached is not None:
+                span.set(actions=len(cached.get("actions", [])))
+                return cached
+
+            prompt = self._build_prompt(question, dataset_summary, columns, context)
+            span.set(prompt_chars=len(prompt))
+
+            try:
+                raw = self.llm.generate([{"role": "user", "content": prompt}])
+            except Exception as e:
+                raise RuntimeError(f"[ERROR] Failed to generate output from LLM: {e}") from e
+
+            with TRACER.span("parse", raw_chars=len(raw)):
+                plan = PlanParser.parse(raw=raw)
+            span.set(actions=len(plan.get("actions", [])))
+            self._store_plan(question, columns, plan)
+            return plan
+
+    def plan_stream(self, question: str, dataset_summary: str, columns: list, context: str = None) -> Iterator[Dict]:
+        """
+        Yield plan actions one by one while the LLM is still generating the rest of the plan.
+        Falls back to parsing the whole completion if no action could be parsed incrementally.
+        """
+        # Not the active span: it stays open across yields (see Tracer.start_span)
+        span = TRACER.start_span("plan", streamed=True)
         try:
-            raw = self.llm.generate([{"role": "user", "content": prompt}])
-        except Exception as e:
-            raise RuntimeError(f"[ERROR] Failed to generate output from LLM: {e}") from e
+            cached = self._cached_plan(question, columns, parent=span)
+            if cached is not None:
+                yield from cached.get("actions", [])
+                return
 
-        return PlanParser.parse(raw=raw)
\ No newline at end of file
+            prompt = self._build_prompt(question, dataset_summary, columns, context)
+            parser = IncrementalPlanParser()
+            actions = []
+            try:
+                for delta in self.llm.stream_generate([{"role": "user", "content": prompt}]):
+                    for action in parser.feed(delta):
+                        actions.append(action)
+                        yield action
+            except Exception as e:
+                raise RuntimeError(f"[ERROR] Failed to generate output from LLM: {e}") from e
+
+            if not actions:
+                with TRACER.span("parse", span, raw_chars=len(parser.raw)):
+                    actions = PlanParser.parse(raw=parser.raw).get("actions", [])
+                yield from actions
+
+            print("\n[DEBUG] STREAMED PLAN:", actions)
+            if span is not None:
+                span.set(actions=len(actions), prompt_chars=len(prompt))
+            self._store_plan(question, columns, {"actions": actions})
+        except Exception as e:
+            if span is not None:
+                span.fail(str(e))
+            raise
+        finally:
+            TRACER.end_span(span)
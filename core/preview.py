@@ -1,6 +1,5 @@
-from llama_index.core.tools import FunctionTool
 from core.managers.dataset_manager import DatasetManager
-from config import DATA_DIR
+from config import DATA_DIR, COMPUTE_BACKEND, DUCKDB_MEMORY_LIMIT
 
 manager = DatasetManager()
 
@@ -8,6 +7,13 @@ def show_head(dataset_name: str, n: int = 5):
     """Return the first n rows of the dataset."""
     try:
         dataset_path = DATA_DIR / dataset_name
+        if COMPUTE_BACKEND == "duckdb":
+            # Read through DuckDB so the preview never loads the whole file into pandas
+            source = manager.attach(dataset_path, memory_limit=DUCKDB_MEMORY_LIMIT)
+            try:
+                return source.head(n)
+            finally:
+                source.close()
         df = manager.load(dataset_path)
         if df is None:
             return f"❌ No dataset named '{dataset_name}' loaded."
@@ -19,14 +25,25 @@ def describe_dataset(dataset_name: str):
     """Return basic statistics of the dataset."""
     try:
         dataset_path = DATA_DIR / dataset_name
+        if COMPUTE_BACKEND == "duckdb":
+            manager.attach(dataset_path, memory_limit=DUCKDB_MEMORY_LIMIT).close()
+            return manager.profile.describe
         df = manager.load(dataset_path)
         if df is None:
             return f"❌ No dataset named '{dataset_name}' loaded."
-        return df.describe(include="all")
+        return manager.profile.describe
     except Exception as e:
         return f"❌ Error describing dataset: {str(e)}"
 
-TOOLS = {
-    "head": FunctionTool.from_defaults(fn=show_head),
-    "describe": FunctionTool.from_defaults(fn=describe_dataset),
-}
\ No newline at end of file
+_TOOLS = None
+
+def get_tools():
+    """llama_index tool wrappers, built on first use so previews never import llama_index."""
+    global _TOOLS
+    if _TOOLS is None:
+        from llama_index.core.tools import FunctionTool
+        _TOOLS = {
+            "head": FunctionTool.from_defaults(fn=show_head),
+            "describe": FunctionTool.from_defaults(fn=describe_dataset),
+        }
+    return _TOOLS
\ No newline at end of file
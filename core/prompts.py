@@ -23,6 +23,7 @@ Your task:
   * describe → must include {"columns": ["col1", "col2", ...]}
 - Always pair compute actions with at least one appropriate visualize action
   (correlation → heatmap, groupby → boxplot, describe → histogram, timeseries_aggregate → timeseries).
+- A visualize action may include {"source": <index of a compute action in the array>} to plot that action's result.
 - In the answer "text", interpret the compute results and answer the user's question.
 - Use only exact column names.
 - The answer text should reference specific findings from the compute results, keep it concise (max 700 words). Remove line breaks and escape all quotes.
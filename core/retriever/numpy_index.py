@@ -0,0 +1,120 @@
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import json
+import numpy as np
+
+
+class NumpyVectorIndex:
+    """
+    In-process cosine-similarity index for small corpora such as the column documents
+    of one dataset. Vectors are normalized once, so a query is a single mat-vec product.
+    With a `path`, documents are persisted with their vectors and reused by later
+    builds, so only new documents are embedded.
+    """
+
+    def __init__(self, embed_model, path: Optional[Path] = None):
+        self.embed_model = embed_model
+        self.path = Path(path) if path is not None else None
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.vectors = np.zeros((0, 0), dtype=np.float32)
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _load_stored(self) -> Dict[str, Tuple[np.ndarray, Optional[str], Optional[Dict[str, Any]]]]:
+        """Persisted documents by id as (vector, text, metadata); older files only hold vectors."""
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                ids = json.loads(str(data["ids"]))
+                texts = json.loads(str(data["texts"])) if "texts" in data else [None] * len(ids)
+                metadatas = json.loads(str(data["metadatas"])) if "metadatas" in data else [None] * len(ids)
+                return {i: (v, t, m) for i, v, t, m in zip(ids, data["vectors"], texts, metadatas)}
+        except Exception as e:
+            print(f"[NUMPY INDEX] ignoring unreadable {self.path}: {e}")
+            return {}
+
+    def _save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            ids, texts, metadatas, vectors = self.ids, self.texts, self.metadatas, self.vectors
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            ids=np.array(json.dumps(ids)),
+            texts=np.array(json.dumps(texts)),
+            metadatas=np.array(json.dumps(metadatas, default=str)),
+            vectors=vectors,
+        )
+        tmp.replace(self.path)
+
+    def build(
+        self,
+        ids: List[str],
+        texts: List[str],
+        metadatas: List[Dict[str, Any]],
+        keep: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> int:
+        """
+        Index the given documents, reusing stored vectors by id. Documents already in the
+        index (added with `add` or persisted) that are not rebuilt are kept when `keep`
+        accepts their metadata. Returns how many were embedded.
+        """
+        stored = self._load_stored()
+        with self._lock:
+            for node_id, text, metadata, vector in zip(self.ids, self.texts, self.metadatas, self.vectors):
+                stored.setdefault(node_id, (vector, text, metadata))
+        missing = [i for i, node_id in enumerate(ids) if node_id not in stored]
+        if missing:
+            fresh = self.embed_model.get_text_embedding_batch([texts[i] for i in missing])
+            stored.update({ids[i]: (v, texts[i], metadatas[i]) for i, v in zip(missing, self._normalize(fresh))})
+
+        rebuilt = set(ids)
+        kept = [
+            (node_id, text, metadata) for node_id, (_, text, metadata) in stored.items()
+            if node_id not in rebuilt and text is not None and keep is not None and keep(metadata or {})
+        ]
+        all_ids = list(ids) + [node_id for node_id, _, _ in kept]
+        with self._lock:
+            self.ids = all_ids
+            self.texts = list(texts) + [text for _, text, _ in kept]
+            self.metadatas = list(metadatas) + [metadata or {} for _, _, metadata in kept]
+            self.vectors = (
+                self._normalize([stored[i][0] for i in all_ids]) if all_ids else np.zeros((0, 0), dtype=np.float32)
+            )
+        self._save()
+        return len(missing)
+
+    def add(self, node_id: str, text: str, metadata: Dict[str, Any]):
+        vector = self._normalize(self.embed_model.get_text_embedding(text))
+        with self._lock:
+            self.ids.append(node_id)
+            self.texts.append(text)
+            self.metadatas.append(metadata)
+            self.vectors = vector if not len(self.vectors) else np.vstack([self.vectors, vector])
+        self._save()
+
+    def query(self, text: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        with self._lock:
+            vectors, texts, metadatas = self.vectors, self.texts, self.metadatas
+        if not len(vectors):
+            return []
+        scores = vectors @ self._normalize(self.embed_model.get_query_embedding(text))[0]
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [{"text": texts[i], "metadata": metadatas[i], "score": float(scores[i])} for i in best]
@@ -1,17 +1,36 @@
+from typing import Any, Dict, List
 from core.managers.index_manager import IndexManager
+from core.tracing import TRACER
+from config import RETRIEVER_MODE
 
 
 class Retriever:
-    def __init__(self, index_manager: IndexManager) -> str:
+    def __init__(self, index_manager: IndexManager, mode: str = RETRIEVER_MODE) -> str:
         self.index_manager = index_manager
+        self.mode = mode
+
+    def retrieve_nodes(self, query: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """Top-k dataset documents (text, metadata, score) by vector similarity alone."""
+        if not self.index_manager or not self.index_manager.index:
+            return []
+        return self.index_manager.query(query, top_k)
 
     def retrieve(self, query: str, top_k: int = 3) -> str:
         """Return relevant context from dataset."""
         if not self.index_manager or not self.index_manager.index:
             return ""
-        try:
-            query_engine = self.index_manager.index.as_query_engine(similarity_top_k=top_k)
-            response = query_engine.query(query)
-            return str(response)
-        except Exception:
-            return "[Retriever: failed to fetch relevant context]"
\ No newline at end of file
+        with TRACER.span("retrieve", mode=self.mode, top_k=top_k) as span:
+            try:
+                if self.mode == "synthesize" and self.index_manager.backend == "chroma":
+                    # Legacy path: an extra LLM round trip summarizes the retrieved documents
+                    query_engine = self.index_manager.index.as_query_engine(similarity_top_k=top_k)
+                    context = str(query_engine.query(query))
+                else:
+                    nodes = self.retrieve_nodes(query, top_k)
+                    span.set(hits=len(nodes))
+                    context = "\n\n".join(node["text"] for node in nodes)
+            except Exception as e:
+                span.fail(str(e))
+                return "[Retriever: failed to fetch relevant context]"
+            span.set(result_chars=len(context))
+            return context
@@ -0,0 +1,333 @@
+"""
+Structured spans and Prometheus metrics for the question pipeline.
+
+A span times one stage (retrieval, an LLM call, one plan action, a render) and carries
+attributes such as rows touched, result size, cache hits and LLM token counts. The
+active span lives in a context variable, so nested stages become children of it; work
+handed to a thread pool keeps its parent when submitted through `TRACER.wrap`.
+
+Finished traces are appended to TRACE_EXPORT_PATH as JSONL (one span per line) and
+every span feeds the process-wide METRICS registry, exposed in the Prometheus text
+format by the API's /metrics route or by `start_metrics_server`.
+"""
+import contextvars
+import json
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+from config import METRICS_PORT, TRACE_EXPORT_PATH, TRACING_ENABLED
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent else None
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.children: List["Span"] = []
+        self._lock = Lock()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def add(self, key: str, amount: float):
+        with self._lock:
+            self.attributes[key] = self.attributes.get(key, 0) + amount
+
+    def fail(self, message: str):
+        self.status = "error"
+        self.error = str(message)[:500]
+
+    def walk(self, depth: int = 0) -> Iterator[Tuple[int, "Span"]]:
+        yield depth, self
+        for child in sorted(self.children, key=lambda c: c.start):
+            yield from child.walk(depth + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        """The trace as flat rows (depth-first, children by start time) for display."""
+        total = self.duration or 0.0
+        rows = []
+        for depth, span in self.walk():
+            rows.append({
+                "stage": "  " * depth + span.name,
+                "ms": round((span.duration or 0.0) * 1000, 1),
+                "share": round(span.duration / total, 3) if total and span.duration is not None else None,
+                "status": span.status,
+                **span.attributes,
+                **({"error": span.error} if span.error else {}),
+            })
+        return rows
+
+
+class _NullSpan:
+    """Stands in for a span when tracing is disabled, so call sites need no checks."""
+    duration = None
+
+    def set(self, **attributes):
+        pass
+
+    def add(self, key: str, amount: float):
+        pass
+
+    def fail(self, message: str):
+        pass
+
+    def breakdown(self) -> List[Dict[str, Any]]:
+        return []
+
+
+NULL_SPAN = _NullSpan()
+
+
+def size_attributes(value: Any) -> Dict[str, Any]:
+    """Size of a stage result: rows and bytes for frames, items for collections, bytes for figures."""
+    if isinstance(value, pd.DataFrame):
+        return {"result_rows": len(value), "result_bytes": int(value.memory_usage(deep=True).sum())}
+    if isinstance(value, pd.Series):
+        return {"result_rows": len(value), "result_bytes": int(value.memory_usage(deep=True))}
+    if isinstance(value, (list, dict)):
+        return {"result_items": len(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {"result_bytes": len(value)}
+    if isinstance(value, str):
+        return {"result_chars": len(value)}
+    data = getattr(value, "data", None)  # RenderedFigure
+    if isinstance(data, (bytes, bytearray)):
+        return {"result_bytes": len(data)}
+    return {}
+
+
+class Metrics:
+    """Counters, gauges and histograms with labels, rendered in the Prometheus text format."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+    HELP = {
+        "stage_duration_seconds": ("histogram", "Duration of each traced stage"),
+        "stage_errors_total": ("counter", "Traced stages that failed"),
+        "cache_requests_total": ("counter", "Cache lookups by stage and result"),
+        "llm_tokens_total": ("counter", "LLM tokens by kind"),
+        "rows_processed_total": ("counter", "Dataset rows read by compute and chart stages"),
+    }
+
+    def __init__(self, namespace: str = "ka7lanzi"):
+        self.namespace = namespace
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._gauges: Dict[Tuple[str, tuple], float] = {}
+        self._histograms: Dict[Tuple[str, tuple], List[float]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> tuple:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self._gauges[(name, self._labels(labels))] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, self._labels(labels))
+        with self._lock:
+            # per-bucket counts, then sum and count
+            hist = self._histograms.setdefault(key, [0.0] * (len(self.BUCKETS) + 2))
+            i = bisect_left(self.BUCKETS, value)
+            if i < len(self.BUCKETS):
+                hist[i] += 1
+            hist[-2] += value
+            hist[-1] += 1
+
+    def observe_span(self, span: Span):
+        stage = span.name
+        if span.duration is not None:
+            self.observe("stage_duration_seconds", span.duration, stage=stage)
+        if span.status == "error":
+            self.inc("stage_errors_total", stage=stage)
+        attrs = span.attributes
+        if "cache_hit" in attrs:
+            self.inc("cache_requests_total", stage=stage, result="hit" if attrs["cache_hit"] else "miss")
+        for kind in ("prompt", "completion"):
+            tokens = attrs.get(f"{kind}_tokens")
+            if tokens:
+                self.inc("llm_tokens_total", tokens, kind=kind)
+        if attrs.get("rows"):
+            self.inc("rows_processed_total", attrs["rows"], stage=stage)
+
+    @staticmethod
+    def _format_labels(labels: tuple, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+    def render(self) -> str:
+        with self._lock:
+            counters, gauges = dict(self._counters), dict(self._gauges)
+            histograms = {k: list(v) for k, v in self._histograms.items()}
+        lines: List[str] = []
+        described = set()
+
+        def header(name: str, kind: str):
+            if name in described:
+                return
+            described.add(name)
+            help_text = self.HELP.get(name, (kind, name.replace("_", " ")))[1]
+            lines.append(f"# HELP {self.namespace}_{name} {help_text}")
+            lines.append(f"# TYPE {self.namespace}_{name} {kind}")
+
+        for (name, labels), value in sorted(counters.items()):
+            header(name, "counter")
+            lines.append(f"{self.namespace}_{name}{self._format_labels(labels)} {value:g}")
+        for (name, labels), value in sorted(gauges.items()):
+            header(name, "gauge")
+            lines.append(f"{self.namespace}_{name}{self._format_labels(labels)} {value:g}")
+        for (name, labels), hist in sorted(histograms.items()):
+            header(name, "histogram")
+            cumulative = 0.0
+            for bound, count in zip(self.BUCKETS, hist):
+                cumulative += count
+                lines.append(f"{self.namespace}_{name}_bucket{self._format_labels(labels, (('le', f'{bound:g}'),))} {cumulative:g}")
+            lines.append(f"{self.namespace}_{name}_bucket{self._format_labels(labels, (('le', '+Inf'),))} {hist[-1]:g}")
+            lines.append(f"{self.namespace}_{name}_sum{self._format_labels(labels)} {hist[-2]:g}")
+            lines.append(f"{self.namespace}_{name}_count{self._format_labels(labels)} {hist[-1]:g}")
+        return "\n".join(lines) + "\n"
+
+
+class Tracer:
+    def __init__(self, metrics: Metrics, enabled: bool = TRACING_ENABLED, export_path: Optional[str] = TRACE_EXPORT_PATH):
+        self.metrics = metrics
+        self.enabled = enabled
+        self.export_path = Path(export_path) if export_path else None
+        self._export_lock = Lock()
+
+    def current(self) -> Optional[Span]:
+        return _current.get()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes) -> Optional[Span]:
+        """
+        A child of `parent` (by default the active span) that is not made active itself.
+        Generators use this instead of `span`, since a context variable set across a
+        `yield` would leak into the consumer's stages.
+        """
+        if not self.enabled:
+            return None
+        parent = parent or _current.get()
+        span = Span(name, parent, attributes)
+        if parent is not None:
+            with parent._lock:
+                parent.children.append(span)
+        return span
+
+    def end_span(self, span: Optional[Span]):
+        if span is None or span.duration is not None:
+            return
+        span.duration = time.perf_counter() - span._t0
+        self.metrics.observe_span(span)
+        if span.parent_id is None:
+            self._export(span)
+
+    @contextmanager
+    def span(self, name: str, parent: Optional[Span] = None, **attributes):
+        span = self.start_span(name, parent, **attributes)
+        if span is None:
+            yield NULL_SPAN
+            return
+        token = _current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current.reset(token)
+            self.end_span(span)
+
+    def wrap(self, fn: Callable) -> Callable:
+        """
+        Bind `fn` to the current context (and so the active span) for a call on another
+        thread. Wrap once per submission: a context cannot be entered by two threads.
+        """
+        ctx = contextvars.copy_context()
+        return lambda *args, **kwargs: ctx.run(fn, *args, **kwargs)
+
+    def _export(self, root: Span):
+        if self.export_path is None:
+            return
+        try:
+            lines = "".join(json.dumps(s.to_dict(), default=str) + "\n" for _, s in root.walk())
+            with self._export_lock:
+                self.export_path.parent.mkdir(parents=True, exist_ok=True)
+                with self.export_path.open("a", encoding="utf-8") as f:
+                    f.write(lines)
+        except Exception as e:
+            print(f"[TRACING] export failed: {e}")
+
+
+METRICS = Metrics()
+TRACER = Tracer(METRICS)
+
+_metrics_server: Optional[ThreadingHTTPServer] = None
+_metrics_server_lock = Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = METRICS.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = "0.0.0.0") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics from a daemon thread (once per process); a port of 0 disables it."""
+    global _metrics_server
+    if port <= 0:
+        return None
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                print(f"[TRACING] metrics server not started on port {port}: {e}")
+                return None
+            Thread(target=_metrics_server.serve_forever, name="metrics", daemon=True).start()
+    return _metrics_server
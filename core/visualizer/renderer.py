@@ -0,0 +1,89 @@
+import io
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import BoundedSemaphore
+from typing import Callable, Optional
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from core.tracing import TRACER
+from config import RENDER_DPI, RENDER_FORMAT, RENDER_MAX_IN_FLIGHT, RENDER_MAX_WORKERS
+
+MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+@dataclass
+class RenderedFigure:
+    """An encoded chart; holds no reference to matplotlib objects."""
+    name: Optional[str]
+    data: bytes
+    format: str = "png"
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.format]
+
+
+class FigureRenderer:
+    """
+    Draws figures on a worker pool with the Agg canvas and returns encoded bytes.
+    Figures are built with the object-oriented API, so they never enter pyplot's
+    global registry, and are cleared as soon as they are encoded. At most
+    `max_in_flight` renders are queued or running; further submits block.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = RENDER_MAX_WORKERS,
+        max_in_flight: int = RENDER_MAX_IN_FLIGHT,
+        fmt: str = RENDER_FORMAT,
+        dpi: int = RENDER_DPI,
+    ):
+        if fmt not in MIME_TYPES:
+            raise ValueError(f"Unsupported render format '{fmt}'")
+        self.format = fmt
+        self.dpi = dpi
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="render")
+        self._in_flight = BoundedSemaphore(max_in_flight)
+
+    def _encode(self, fig: Figure) -> bytes:
+        FigureCanvasAgg(fig)
+        buf = io.BytesIO()
+        fig.savefig(buf, format=self.format, dpi=self.dpi, bbox_inches="tight")
+        return buf.getvalue()
+
+    def _render(self, name: Optional[str], draw: Callable[[], Optional[Figure]], submitted: float) -> Optional[RenderedFigure]:
+        fig = None
+        try:
+            with TRACER.span("render", chart=name, format=self.format) as span:
+                span.set(queued_seconds=round(time.perf_counter() - submitted, 4))
+                t0 = time.perf_counter()
+                fig = draw()
+                if fig is None:
+                    return None
+                drawn = time.perf_counter()
+                data = self._encode(fig)
+                span.set(draw_seconds=round(drawn - t0, 4), encode_seconds=round(time.perf_counter() - drawn, 4), result_bytes=len(data))
+                return RenderedFigure(name=name, data=data, format=self.format)
+        finally:
+            if fig is not None:
+                fig.clear()
+            self._in_flight.release()
+
+    def submit(self, name: Optional[str], draw: Callable[[], Optional[Figure]]) -> Future:
+        submitted = time.perf_counter()
+        self._in_flight.acquire()
+        try:
+            return self._pool.submit(TRACER.wrap(self._render), name, draw, submitted)
+        except Exception:
+            self._in_flight.release()
+            raise
+
+    def render(self, name: Optional[str], draw: Callable[[], Optional[Figure]]) -> Optional[RenderedFigure]:
+        return self.submit(name, draw).result()
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+FIGURE_RENDERER = FigureRenderer()
@@ -0,0 +1,74 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling. `x` must be sorted; returns the
+    indices of the `n_out` points that best preserve the visual shape of the line.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_line(x: pd.Series, y: pd.Series, n_out: int) -> pd.DataFrame:
+    """Sort by x, drop missing points and keep at most `n_out` of them with LTTB."""
+    frame = pd.DataFrame({"x": x.to_numpy(), "y": y.to_numpy()}).dropna()
+    if not frame["x"].is_monotonic_increasing:
+        frame = frame.sort_values("x", kind="stable")
+    if pd.api.types.is_datetime64_any_dtype(frame["x"]):
+        xs = frame["x"].to_numpy().astype("int64")
+    elif pd.api.types.is_numeric_dtype(frame["x"]):
+        xs = frame["x"].to_numpy()
+    else:
+        xs = np.arange(len(frame))
+    return frame.iloc[lttb_indices(xs, frame["y"].to_numpy(), n_out)]
+
+
+def box_stats(values: pd.Series, groups: Optional[pd.Series] = None) -> List[Dict]:
+    """
+    Per-group boxplot statistics (quartiles and 1.5 IQR whiskers) in the format of
+    `Axes.bxp`, computed with grouped quantiles instead of handing raw rows to the plot.
+    """
+    frame = pd.DataFrame({
+        "v": values.to_numpy(),
+        "g": groups.to_numpy() if groups is not None else str(values.name or ""),
+    }).dropna()
+    grouped = frame.groupby("g", observed=True, sort=True)["v"]
+    q = grouped.quantile([0.25, 0.5, 0.75]).unstack()
+    iqr = q[0.75] - q[0.25]
+    lo = (q[0.25] - 1.5 * iqr).reindex(frame["g"]).to_numpy()
+    hi = (q[0.75] + 1.5 * iqr).reindex(frame["g"]).to_numpy()
+    whislo = frame["v"].where(frame["v"].to_numpy() >= lo).groupby(frame["g"], observed=True).min()
+    whishi = frame["v"].where(frame["v"].to_numpy() <= hi).groupby(frame["g"], observed=True).max()
+
+    return [
+        {
+            "label": str(g),
+            "q1": q.at[g, 0.25],
+            "med": q.at[g, 0.5],
+            "q3": q.at[g, 0.75],
+            "whislo": whislo.get(g, q.at[g, 0.25]),
+            "whishi": whishi.get(g, q.at[g, 0.75]),
+        }
+        for g in q.index
+    ]
@@ -1,60 +1,140 @@
-import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
-import seaborn as sns
 import pandas as pd
-from typing import List
+from typing import List, Optional
 from core.interfaces.ivisualizer import IVisualizer
+from core.managers.profile import numeric_columns
+from core.visualizer.renderer import FIGURE_RENDERER, FigureRenderer, RenderedFigure
+from core.visualizer.sampling import box_stats, downsample_line
+from config import VIZ_BOXPLOT_RAW_ROWS, VIZ_LINE_MAX_POINTS, VIZ_SCATTER_HEXBIN_ROWS
+
+# Compute results each chart can be drawn from without another pass over the dataset.
+# Boxplots are not listed: they show the distribution of the raw rows.
+RESULT_SOURCES = {
+    "heatmap": ("correlation",),
+    "barplot": ("groupby",),
+    "timeseries": ("timeseries", "timeseries_aggregate"),
+    "lineplot": ("timeseries", "timeseries_aggregate"),
+}
 
 
 class Visualizer(IVisualizer):
-    def __init__(self):
-        sns.set_style("whitegrid")
+    def __init__(
+        self,
+        renderer: FigureRenderer = FIGURE_RENDERER,
+        line_max_points: int = VIZ_LINE_MAX_POINTS,
+        scatter_hexbin_rows: int = VIZ_SCATTER_HEXBIN_ROWS,
+        boxplot_raw_rows: int = VIZ_BOXPLOT_RAW_ROWS,
+    ):
+        self._sns = None
+        self.renderer = renderer
+        self.line_max_points = line_max_points
+        self.scatter_hexbin_rows = scatter_hexbin_rows
+        self.boxplot_raw_rows = boxplot_raw_rows
 
-    def heatmap(self, df: pd.DataFrame, columns: List[str])-> Figure:
-        corr = df[columns].corr()
-        fig, ax = plt.subplots(figsize=(6,5))
-        sns.heatmap(corr, annot=True, ax=ax)
+    @property
+    def sns(self):
+        # seaborn (and scipy behind it) is imported with the first chart, not at startup
+        if self._sns is None:
+            import seaborn
+            seaborn.set_style("whitegrid")
+            self._sns = seaborn
+        return self._sns
+
+    @staticmethod
+    def _above(n_rows: int, threshold: int) -> bool:
+        return threshold > 0 and n_rows > threshold
+
+    @staticmethod
+    def _note(fig: Figure, text: str):
+        fig.text(0.01, 0.01, text, fontsize=7, color="gray", ha="left", va="bottom")
+
+    @staticmethod
+    def _new_figure(figsize):
+        # Figures are created outside pyplot so nothing keeps them alive once encoded
+        fig = Figure(figsize=figsize)
+        return fig, fig.subplots()
+
+    def _heatmap_figure(self, corr: pd.DataFrame) -> Figure:
+        fig, ax = self._new_figure((6,5))
+        self.sns.heatmap(corr, annot=True, ax=ax)
         ax.set_title("Correlation heatmap")
         return fig
 
+    def heatmap(self, df: pd.DataFrame, columns: List[str])-> Figure:
+        return self._heatmap_figure(df[columns].corr())
+
     def boxplot(self, df: pd.DataFrame, column: str, by: str = None)-> Figure:
-        fig, ax = plt.subplots(figsize=(6,4))
-        if by is None:
-            sns.boxplot(y=df[column], ax=ax)
+        fig, ax = self._new_figure((6,4))
+        if self._above(len(df), self.boxplot_raw_rows):
+            stats = box_stats(df[column], df[by] if by is not None else None)
+            ax.bxp(stats, showfliers=False)
+            if by is not None:
+                ax.set_xlabel(by)
+            ax.set_ylabel(column)
+            self._note(fig, f"Boxes computed from quantiles of {len(df):,} rows; outliers not drawn")
+        elif by is None:
+            self.sns.boxplot(y=df[column], ax=ax)
         else:
-            sns.boxplot(x=by, y=column, data=df, ax=ax)
+            self.sns.boxplot(x=by, y=column, data=df[[by, column]], ax=ax)
         ax.set_title(f"Boxplot {column}")
         return fig
 
     def scatter(self, df: pd.DataFrame, x: str, y: str)-> Figure:
-        fig, ax = plt.subplots(figsize=(6,4))
-        sns.scatterplot(x=df[x], y=df[y], ax=ax)
+        fig, ax = self._new_figure((6,4))
+        if self._above(len(df), self.scatter_hexbin_rows):
+            points = df[[x, y]].dropna()
+            hb = ax.hexbin(points[x], points[y], gridsize=60, mincnt=1, bins="log", cmap="viridis")
+            fig.colorbar(hb, ax=ax, label="count")
+            self._note(fig, f"Binned density of {len(points):,} points")
+        else:
+            self.sns.scatterplot(x=df[x], y=df[y], ax=ax)
         ax.set_xlabel(x); ax.set_ylabel(y)
         return fig
 
     def histogram(self, df: pd.DataFrame, column: str, bins: int = 30)-> Figure:
-        fig, ax = plt.subplots(figsize=(6,4))
+        fig, ax = self._new_figure((6,4))
         ax.hist(df[column].dropna(), bins=bins)
         ax.set_title(f"Histogram {column}")
         return fig
     
     def barplot(self, df: pd.DataFrame, x: str, y: str = None) -> Figure:
-        fig, ax = plt.subplots(figsize=(6,4))
+        fig, ax = self._new_figure((6,4))
         if y:
-            sns.barplot(x=x, y=y, data=df, ax=ax)
+            self.sns.barplot(x=x, y=y, data=df[[x, y]], ax=ax)
         else:
             df[x].value_counts().plot(kind='bar', ax=ax)
         ax.set_title(f"Barplot {x}" if not y else f"Barplot {x} vs {y}")
         return fig
 
+    def _draw_line(self, fig: Figure, ax, x: pd.Series, y: pd.Series):
+        if self._above(len(x), self.line_max_points):
+            points = downsample_line(x, y, self.line_max_points)
+            ax.plot(points["x"], points["y"])
+            ax.set_xlabel(x.name); ax.set_ylabel(y.name)
+            self._note(fig, f"Downsampled (LTTB) to {len(points):,} of {len(x):,} points")
+        else:
+            self.sns.lineplot(x=x, y=y, ax=ax)
+
     def lineplot(self, df: pd.DataFrame, x: str, y: str) -> Figure:
-        fig, ax = plt.subplots(figsize=(6,4))
-        sns.lineplot(x=x, y=y, data=df, ax=ax)
+        fig, ax = self._new_figure((6,4))
+        self._draw_line(fig, ax, df[x], df[y])
         ax.set_title(f"Lineplot {y} over {x}")
         return fig
+
+    def timeseries(self, df: pd.DataFrame, date_column: str, value_column: str, freq: str = None) -> Figure:
+        fig, ax = self._new_figure((7,4))
+        dates = pd.to_datetime(df[date_column])
+        series = df[value_column]
+        if freq:
+            resampled = series.set_axis(pd.DatetimeIndex(dates, name=date_column)).resample(freq).sum()
+            dates, series = resampled.index.to_series(), resampled
+        self._draw_line(fig, ax, dates.rename(date_column), series.rename(value_column))
+        ax.set_title(f"{value_column} over time")
+        fig.autofmt_xdate()
+        return fig
     
     def piechart(self, df: pd.DataFrame, column: str) -> Figure:
-        fig, ax = plt.subplots(figsize=(5,5))
+        fig, ax = self._new_figure((5,5))
         df[column].value_counts().plot.pie(autopct='%1.1f%%', ax=ax)
         ax.set_ylabel('')
         ax.set_title(f"Pie chart of {column}")
@@ -65,8 +145,9 @@ class Visualizer(IVisualizer):
         params = step.get("params", {})
 
         if name == "heatmap":
-            cols = params.get("columns", df.columns)
-            numeric_cols = [c for c in cols if c in df.select_dtypes(include="number").columns]
+            cols = params.get("columns") or df.columns
+            numeric = set(numeric_columns(df))
+            numeric_cols = [c for c in cols if c in numeric]
             return self.heatmap(df, numeric_cols)
         elif name == "boxplot":
             return self.boxplot(df, params.get("column"), params.get("by"))
@@ -78,7 +159,82 @@ class Visualizer(IVisualizer):
             return self.barplot(df, params.get("x"), params.get("y"))
         elif name == "lineplot":
             return self.lineplot(df, params.get("x"), params.get("y"))
+        elif name == "timeseries":
+            return self.timeseries(df, params.get("date_column"), params.get("value_column"), params.get("freq"))
         elif name == "piechart":
             return self.piechart(df, params.get("column"))
         print("[DEBUG]: Visualization action not considered yet!")
-        return None
\ No newline at end of file
+        return None
+
+    def render(self, df: pd.DataFrame, step: dict) -> Optional[RenderedFigure]:
+        """Draw the step on the render pool and return the encoded figure."""
+        return self.renderer.render(step.get("name"), lambda: self.dispatch(df, step))
+
+    def accepts_result(self, step: dict, compute: dict, explicit: bool = False, numeric: Optional[List[str]] = None) -> bool:
+        """
+        Whether `step` can be drawn from the result of the `compute` action alone. Unless the
+        step names that action as its `source` (`explicit`), its parameters must match too.
+        `numeric` lists the dataset's numeric columns, which a heatmap without columns covers.
+        """
+        name = step.get("name")
+        if compute.get("name") not in RESULT_SOURCES.get(name, ()):
+            return False
+        if name == "heatmap" and "target" in compute:
+            # Target correlations are absolute values; the heatmap shows the signed matrix
+            return False
+        if explicit:
+            return True
+        params = step.get("params") or {}
+        if name == "heatmap":
+            wanted = params.get("columns") or numeric
+            if not wanted:
+                return False
+            wanted, available = set(wanted), set(compute.get("columns") or [])
+            if numeric is not None:
+                # Both charts drop non-numeric columns
+                wanted, available = wanted & set(numeric), available & set(numeric)
+            return bool(wanted) and wanted <= available
+        if name == "barplot":
+            x, y = params.get("x"), params.get("y")
+            if x is not None and y is None:
+                # A barplot of x alone counts the rows per value
+                return False
+            return x in (None, compute.get("by")) and y in (None, compute.get("target"))
+        if name == "lineplot":
+            return params.get("x") in (None, compute.get("date_column")) and params.get("y") in (None, compute.get("value_column"))
+        return (params.get("date_column") in (None, compute.get("date_column"))
+                and params.get("value_column") in (None, compute.get("value_column"))
+                and params.get("freq") in (None, compute.get("freq")))
+
+    def dispatch_result(self, step: dict, compute: dict, value) -> Figure | None:
+        """Draw a chart from a compute action's result instead of the raw dataset."""
+        name = step.get("name")
+        params = step.get("params") or {}
+
+        if name == "heatmap":
+            corr = pd.DataFrame(value)
+            if params.get("columns"):
+                cols = [c for c in params["columns"] if c in corr.index]
+                corr = corr.loc[cols, cols]
+            return self._heatmap_figure(corr)
+        elif name == "barplot":
+            frame = pd.DataFrame(value)
+            by = compute.get("by")
+            values = [c for c in frame.columns if c != by]
+            fig, ax = self._new_figure((6,4))
+            frame.plot(kind="bar", x=by, y=values, ax=ax, legend=len(values) > 1)
+            ax.set_title(f"{compute.get('agg', 'mean')} of {', '.join(map(str, values))} by {by}")
+            return fig
+        elif name in ("timeseries", "lineplot"):
+            frame = pd.DataFrame(value)
+            x, y = compute.get("date_column"), compute.get("value_column")
+            fig, ax = self._new_figure((7,4))
+            self._draw_line(fig, ax, frame[x], frame[y])
+            ax.set_title(f"{y} over time")
+            fig.autofmt_xdate()
+            return fig
+        print("[DEBUG]: Visualization action not considered yet!")
+        return None
+
+    def render_result(self, step: dict, compute: dict, value) -> Optional[RenderedFigure]:
+        return self.renderer.render(step.get("name"), lambda: self.dispatch_result(step, compute, value))
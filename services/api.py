@@ -0,0 +1,295 @@
+"""
+Headless HTTP API for the agent.
+
+    uvicorn services.api:app --host 0.0.0.0 --port 8000
+    python -m services.api
+
+Endpoints:
+- PUT  /datasets/{name}            raw file body; stored in the uploads directory and loaded
+- GET  /datasets/{name}/preview    first rows and column statistics
+- POST /datasets/{name}/ask        {"question": "..."} -> answer, tables, base64 figures, timings
+- GET  /health
+- GET  /metrics                    Prometheus text: per-stage latencies, cache hits, LLM tokens
+
+Questions run on a bounded worker pool so planning, execution and rendering never block
+the event loop. At most API_MAX_WORKERS questions run at once and API_QUEUE_SIZE more may
+wait; beyond that the server answers 429. A question whose client disconnects is dropped
+from the queue; one that already started cannot be interrupted, so it runs to completion,
+keeps its slot until then, and its result is discarded.
+"""
+import asyncio
+import base64
+import json
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Set
+
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from config import (
+    ALLOWED_EXTENSIONS, API_MAX_AGENTS, API_MAX_UPLOAD_MB, API_MAX_WORKERS, API_QUEUE_SIZE, COMPUTE_BACKEND,
+    DATA_DIR, DUCKDB_MEMORY_LIMIT,
+)
+from core.managers.dataset_manager import DatasetManager
+from core.tracing import METRICS
+from core.visualizer.renderer import RenderedFigure
+from services.init import Init
+
+DISCONNECT_POLL_SECONDS = 0.5
+
+
+class AskRequest(BaseModel):
+    question: str
+
+
+class AgentPool:
+    """
+    One initialized agent per dataset, most recently used kept, shared by all requests.
+    An agent evicted or dropped while questions still run on it is only closed once the
+    last of them finishes, so its dataset connections outlive every in-flight question.
+    """
+
+    def __init__(self, max_agents: int = API_MAX_AGENTS):
+        self.max_agents = max_agents
+        self._agents: "OrderedDict[str, Init]" = OrderedDict()
+        # Questions running on each agent, and agents waiting for theirs to finish
+        self._users: Dict[Init, int] = {}
+        self._retired: Set[Init] = set()
+        self._lock = Lock()
+
+    @contextmanager
+    def use(self, name: str) -> Iterator[Init]:
+        init = self._acquire(name)
+        try:
+            yield init
+        finally:
+            self._release(init)
+
+    def _acquire(self, name: str) -> Init:
+        with self._lock:
+            init = self._agents.get(name)
+            if init is not None:
+                self._agents.move_to_end(name)
+                self._users[init] = self._users.get(init, 0) + 1
+                return init
+        init = Init()
+        asyncio.run(init.start_agent_init_async())
+        if not init.is_ready():
+            raise RuntimeError(init._init_error or "agent initialization failed")
+        init.load_dataset(name)
+        with self._lock:
+            kept = self._agents.setdefault(name, init)
+            self._agents.move_to_end(name)
+            self._users[kept] = self._users.get(kept, 0) + 1
+            evicted = [self._agents.popitem(last=False)[1] for _ in range(len(self._agents) - self.max_agents)]
+            if kept is not init:
+                evicted.append(init)
+            idle = self._retire(evicted)
+        for old in idle:
+            old.close()
+        return kept
+
+    def _release(self, init: Init):
+        with self._lock:
+            self._users[init] -= 1
+            if self._users[init] > 0:
+                return
+            del self._users[init]
+            if init not in self._retired:
+                return
+            self._retired.discard(init)
+        init.close()
+
+    def _retire(self, inits: List[Init]) -> List[Init]:
+        """Called under the lock; returns the agents nobody uses, to be closed right away."""
+        idle = []
+        for init in inits:
+            if self._users.get(init):
+                self._retired.add(init)
+            else:
+                idle.append(init)
+        return idle
+
+    def drop(self, name: str):
+        with self._lock:
+            init = self._agents.pop(name, None)
+            idle = self._retire([init]) if init is not None else []
+        for old in idle:
+            old.close()
+
+
+class Admission:
+    """Counts questions running or waiting; refuses new ones once the queue is full."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_flight = 0
+        self._lock = Lock()
+
+    def try_enter(self) -> bool:
+        with self._lock:
+            if self.in_flight >= self.capacity:
+                return False
+            self.in_flight += 1
+            return True
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+app = FastAPI(title="Dataset Analyzer API")
+workers = ThreadPoolExecutor(max_workers=API_MAX_WORKERS, thread_name_prefix="api")
+admission = Admission(API_MAX_WORKERS + API_QUEUE_SIZE)
+agents = AgentPool()
+
+
+def _dataset_path(name: str) -> Path:
+    path = (DATA_DIR / name).resolve()
+    if path.parent != DATA_DIR.resolve() or path.suffix.lower() not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Invalid dataset name '{name}'")
+    return path
+
+
+def _frame_to_json(df: pd.DataFrame) -> Any:
+    # pandas handles NaN, timestamps and numpy scalars when encoding
+    return json.loads(df.to_json(orient="records", date_format="iso", default_handler=str))
+
+
+def _serialize(result: Dict[str, Any]) -> Dict[str, Any]:
+    tables, figures = [], []
+    for item in result.get("figs", []):
+        if isinstance(item, pd.DataFrame):
+            tables.append(_frame_to_json(item))
+        elif isinstance(item, RenderedFigure):
+            figures.append({
+                "name": item.name,
+                "mime_type": item.mime_type,
+                "data": base64.b64encode(item.data).decode("ascii"),
+            })
+    trace = result.get("trace")
+    timings = json.loads(json.dumps(trace.breakdown(), default=str)) if trace is not None else []
+    return {"answer": result.get("answer", ""), "tables": tables, "figures": figures, "timings": timings}
+
+
+def _open_dataset(manager: DatasetManager, path: Path, n: int = 5) -> pd.DataFrame:
+    """Load (or, with the duckdb backend, only convert and profile) a dataset; returns its first rows."""
+    if COMPUTE_BACKEND == "duckdb":
+        source = manager.attach(path, memory_limit=DUCKDB_MEMORY_LIMIT)
+        try:
+            return source.head(n)
+        finally:
+            source.close()
+    return manager.load(path).head(n)
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "in_flight": admission.in_flight, "capacity": admission.capacity}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    METRICS.gauge("api_questions_in_flight", admission.in_flight)
+    METRICS.gauge("api_question_capacity", admission.capacity)
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.put("/datasets/{name}")
+async def upload_dataset(name: str, request: Request):
+    path = _dataset_path(name)
+    limit = API_MAX_UPLOAD_MB * 1024 * 1024
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.upload")
+    size = 0
+    try:
+        with open(tmp, "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds {API_MAX_UPLOAD_MB} MB")
+                f.write(chunk)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+    agents.drop(name)
+    manager = DatasetManager()
+    try:
+        await run_in_threadpool(_open_dataset, manager, path)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Error loading dataset: {e}")
+    return {
+        "name": name,
+        "rows": manager.profile.n_rows,
+        "columns": [str(c) for c in manager.columns],
+        "fingerprint": manager.fingerprint,
+        "memory": str(manager.memory_report) if manager.memory_report is not None else None,
+    }
+
+
+@app.get("/datasets/{name}/preview")
+async def preview_dataset(name: str, n: int = 5):
+    path = _dataset_path(name)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"No dataset named '{name}'")
+
+    def build():
+        manager = DatasetManager()
+        head = _open_dataset(manager, path, n)
+        describe = manager.profile.describe
+        return {
+            "rows": manager.profile.n_rows,
+            "head": _frame_to_json(head),
+            "describe": json.loads(describe.to_json(orient="columns", default_handler=str)),
+        }
+
+    return await run_in_threadpool(build)
+
+
+@app.post("/datasets/{name}/ask")
+async def ask(name: str, body: AskRequest, request: Request):
+    path = _dataset_path(name)
+    if not path.exists():
+        raise HTTPException(status_code=404, detail=f"No dataset named '{name}'")
+    if not admission.try_enter():
+        raise HTTPException(status_code=429, detail="Too many pending questions", headers={"Retry-After": "5"})
+
+    def answer():
+        with agents.use(name) as init:
+            return _serialize(init.ask(body.question))
+
+    try:
+        future = workers.submit(answer)
+    except Exception:
+        admission.leave()
+        raise
+    # The slot is released when the work ends (or is cancelled before starting), never when
+    # the client leaves: a running question cannot be interrupted and keeps its worker busy
+    future.add_done_callback(lambda _: admission.leave())
+    pending = asyncio.wrap_future(future)
+    while True:
+        done, _ = await asyncio.wait({pending}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            break
+        if await request.is_disconnected():
+            # Only dequeues a question that has not started; a running one finishes in the
+            # background, holding its slot until then, and its result is discarded
+            future.cancel()
+            raise HTTPException(status_code=499, detail="Client disconnected")
+    try:
+        return pending.result()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.getenv("API_HOST", "0.0.0.0"), port=int(os.getenv("API_PORT", "8000")))
@@ -0,0 +1,130 @@
+"""
+Headless batch mode: answer a file of questions about one dataset.
+
+    python -m services.batch --dataset sales.csv --questions questions.txt --out reports/sales
+
+Questions are read from a .txt file (one per line) or a .jsonl file ("question" key).
+Retrieval and planning run ahead on a bounded pool of LLM workers while the main
+thread executes the plans in order, so planning question i+1 overlaps executing
+question i. All dataset, profile, result and LLM caches are shared by the questions.
+
+The output directory receives:
+- answers.jsonl: one record per question (answer, timing, table and figure files, error)
+- tables/*.parquet: compute results that form a table
+- figures/*.png|svg: rendered charts
+- summary.json: totals and throughput in questions per minute
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from core.visualizer.renderer import RenderedFigure
+from services.init import Init
+
+DEFAULT_CONCURRENCY = 4
+
+
+def read_questions(path: Path) -> List[str]:
+    lines = [l.strip() for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
+    if path.suffix == ".jsonl":
+        return [json.loads(l)["question"] for l in lines]
+    return lines
+
+
+def _write_table(df: pd.DataFrame, path: Path):
+    try:
+        df.to_parquet(path, index=False)
+    except Exception:
+        # Mixed-type object columns cannot be written as Arrow; keep them as text
+        df.astype({c: str for c in df.columns if df[c].dtype == object}).to_parquet(path, index=False)
+
+
+class BatchRunner:
+    def __init__(self, init: Init, out_dir: Path, concurrency: int = DEFAULT_CONCURRENCY):
+        self.init = init
+        self.agent = init.agent
+        self.out_dir = Path(out_dir)
+        self.concurrency = concurrency
+        (self.out_dir / "tables").mkdir(parents=True, exist_ok=True)
+        (self.out_dir / "figures").mkdir(parents=True, exist_ok=True)
+
+    def _save_outputs(self, idx: int, figs: List[Any]) -> Dict[str, List[str]]:
+        tables, figures = [], []
+        for j, item in enumerate(figs):
+            if isinstance(item, pd.DataFrame):
+                path = self.out_dir / "tables" / f"q{idx:04d}_{j}.parquet"
+                _write_table(item, path)
+                tables.append(str(path.relative_to(self.out_dir)))
+            elif isinstance(item, RenderedFigure):
+                path = self.out_dir / "figures" / f"q{idx:04d}_{j}.{item.format}"
+                path.write_bytes(item.data)
+                figures.append(str(path.relative_to(self.out_dir)))
+        return {"tables": tables, "figures": figures}
+
+    def run(self, questions: List[str]) -> Dict[str, Any]:
+        try:
+            self.agent.ensure_index()
+        except Exception as e:
+            print(f"[BATCH] index unavailable, planning without context: {e}")
+
+        start = time.perf_counter()
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="plan") as planners, \
+                open(self.out_dir / "answers.jsonl", "w", encoding="utf-8") as out:
+            # The pool bounds how many questions are being planned (i.e. in flight at the LLM)
+            plans = [planners.submit(self.agent.prepare, q) for q in questions]
+            for idx, (question, future) in enumerate(zip(questions, plans)):
+                record: Dict[str, Any] = {"index": idx, "question": question}
+                q_start = time.perf_counter()
+                try:
+                    result = self.agent.run_plan(future.result())
+                    record["answer"] = result.get("answer", "")
+                    record.update(self._save_outputs(idx, result.get("figs", [])))
+                except Exception as e:
+                    failed += 1
+                    record["error"] = str(e)
+                record["execute_seconds"] = round(time.perf_counter() - q_start, 3)
+                out.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                out.flush()
+
+        elapsed = time.perf_counter() - start
+        summary = {
+            "questions": len(questions),
+            "failed": failed,
+            "seconds": round(elapsed, 3),
+            "questions_per_minute": round(len(questions) / elapsed * 60, 2) if elapsed else None,
+            "concurrency": self.concurrency,
+        }
+        (self.out_dir / "summary.json").write_text(json.dumps(summary, indent=2))
+        return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", required=True, help="dataset file, absolute or relative to the uploads directory")
+    parser.add_argument("--questions", required=True, type=Path)
+    parser.add_argument("--out", required=True, type=Path)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="questions planned at once")
+    args = parser.parse_args()
+
+    init = Init()
+    asyncio.run(init.start_agent_init_async())
+    if not init.is_ready():
+        raise SystemExit(f"Agent initialization failed: {init._init_error or init.agent._init_error}")
+    init.load_dataset(str(Path(args.dataset).resolve()) if Path(args.dataset).exists() else args.dataset)
+
+    summary = BatchRunner(init, args.out, args.concurrency).run(read_questions(args.questions))
+    print(
+        f"{summary['questions']} questions ({summary['failed']} failed) in {summary['seconds']}s: "
+        f"{summary['questions_per_minute']} questions/min"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,35 @@
 import asyncio
+import threading
 from typing import Optional, Type, Any
+import pandas as pd
 from core.llm import LLM
 
 from core.agent.agent import WorkflowAgent
 
 from core.planner.planner import Planner
+from core.planner.plan_cache import PlanCache
 from core.executor.executor import Executor
 from core.visualizer.visualizer import Visualizer
 
-from config import EMBEDDING_MODEL, LLMODEL
+from config import PLAN_CACHE_ENABLED, get_embedding_model, get_llm
+
+# Executors work on the shared, cached dataset frames rather than private copies.
+# Copy-on-write, enabled once at startup (every entry point imports this module before
+# loading data), guarantees no derived frame can write through to them.
+pd.set_option("mode.copy_on_write", True)
+
+
+def _warm_up():
+    """Load the heavy dependencies ahead of the first question."""
+    try:
+        get_llm()
+        get_embedding_model()
+        import llama_index.core  # noqa: F401
+        import chromadb  # noqa: F401
+        import seaborn  # noqa: F401
+        from core import prompts  # noqa: F401
+    except Exception as e:
+        print(f"[WARMUP] failed: {e}")
 
 
 class Init:
@@ -19,18 +40,33 @@ class Init:
         self._init_error: Optional[str] = None
         self._init_task: Optional[asyncio.Task] = None
         self._init_lock = asyncio.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def start_warmup(self):
+        """Load models in a background thread so pages keep rendering meanwhile."""
+        if self._warmup_thread is None:
+            self._warmup_thread = threading.Thread(target=_warm_up, name="warmup", daemon=True)
+            self._warmup_thread.start()
 
     async def start_agent_init_async(
         self,
-        planner: Optional[Planner] = Planner(llm_client=LLMODEL),
+        planner: Optional[Planner] = None,
         executor: Optional[Type[Executor]] = Executor,
-        visualizer: Optional[Visualizer] = Visualizer(),
-        embeddings_model: Any = EMBEDDING_MODEL, 
-        llm_client: LLM = LLMODEL
+        visualizer: Optional[Visualizer] = None,
+        embeddings_model: Any = None,
+        llm_client: Optional[LLM] = None
     ):
         async with self._init_lock:
             if self.agent.is_ready():
                 return 
+            # Components are cheap to build; models and heavy libraries load on first use
+            if planner is None:
+                planner = Planner(
+                    llm_client=llm_client,
+                    plan_cache=PlanCache(embeddings_model) if PLAN_CACHE_ENABLED else None,
+                )
+            if visualizer is None:
+                visualizer = Visualizer()
             try:
                 await self.agent.async_init(
                     planner=planner,
@@ -65,4 +101,7 @@ class Init:
         return self.agent.load_dataset(dataset_path)
 
     def ask(self, query: str):
-        return self.agent.ask(query)
\ No newline at end of file
+        return self.agent.ask(query)
+
+    def close(self):
+        self.agent.close()
@@ -1,9 +1,9 @@
-from services.init import Init
+from services.sessions import Session
 import streamlit as st
 
 class QueryService:
-    def __init__(self, init: Init):
-        self.init = init
+    def __init__(self, session: Session):
+        self.session = session
 
     def handle_query(self, dataset_name: str, query: str):
         """Process a query and store results in session state."""
@@ -21,14 +21,16 @@ class QueryService:
                 #     """,
                 #     unsafe_allow_html=True,
                 # )
-                res = self.init.ask(query)
+                res = self.session.ask(query)
         except Exception as e:
             st.error(f"Error while processing query: {e}")
             st.session_state["last_answer"] = ""
             st.session_state["last_figs"] = []
+            st.session_state["last_trace"] = None
             return ""
 
         # Store results in session state
         st.session_state["last_answer"] = res.get("answer", "")
         st.session_state["last_figs"] = res.get("figs", [])
+        st.session_state["last_trace"] = res.get("trace")
         return st.session_state["last_answer"]
\ No newline at end of file
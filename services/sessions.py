@@ -0,0 +1,91 @@
+import time
+import uuid
+from threading import Lock
+from typing import Any, Dict, List, Optional
+import pandas as pd
+
+from config import SESSION_IDLE_SECONDS
+from core.managers.dataset_cache import DATASET_CACHE
+from services.init import Init
+
+
+class Session:
+    """
+    Per-user state: an agent with the session's current dataset, and its question history.
+    The dataset itself lives in the process-wide DATASET_CACHE, pinned while the session
+    uses it, so sessions on the same file share one read-only copy.
+    """
+
+    def __init__(self, session_id: str):
+        self.id = session_id
+        self.init = Init()
+        self.dataset: Optional[str] = None
+        self.history: List[Dict[str, Any]] = []
+        self.last_access = time.monotonic()
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+    def open_dataset(self, name: str) -> Optional[pd.DataFrame]:
+        """
+        Switch the session to `name`; the previous dataset is unpinned, not dropped.
+        Returns None with the duckdb backend, which does not load the dataset into pandas.
+        """
+        df = self.init.load_dataset(name)
+        self.dataset = name
+        return df
+
+    def ask(self, question: str) -> Dict[str, Any]:
+        res = self.init.ask(question)
+        self.history.append({"question": question, "dataset": self.dataset, "answer": res.get("answer", "")})
+        return res
+
+    def close(self):
+        self.init.close()
+
+
+class SessionManager:
+    """Sessions by id; sessions idle for longer than `idle_seconds` are closed on the next access."""
+
+    def __init__(self, idle_seconds: int = SESSION_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self._sessions: Dict[str, Session] = {}
+        self._lock = Lock()
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """The session with this id, created if needed (with a fresh id when none is given)."""
+        self.reap()
+        session_id = session_id or uuid.uuid4().hex
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id)
+        session.touch()
+        return session
+
+    def close(self, session_id: str):
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+        if session is not None:
+            session.close()
+
+    def reap(self) -> int:
+        if self.idle_seconds <= 0:
+            return 0
+        deadline = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [s for s in self._sessions.values() if s.last_access < deadline]
+            for s in idle:
+                del self._sessions[s.id]
+        for s in idle:
+            s.close()
+        return len(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            datasets = {s.dataset for s in self._sessions.values() if s.dataset}
+            sessions = len(self._sessions)
+        return {"sessions": sessions, "datasets": len(datasets), "cache": DATASET_CACHE.stats()}
+
+
+SESSIONS = SessionManager()
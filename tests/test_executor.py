@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.executor.executor import Executor
+from core.executor.strategies.correlation import CorrelationStrategy
+from core.executor.strategies.describe import DescribeStrategy
+from core.executor.strategies.filter import FilterStrategy
+from core.executor.strategies.groupby import GroupByStrategy
+from core.executor.strategies.timeseries import TimeSeriesAggregateStrategy
+from core.executor.strategies.topk import TopKStrategy
+from core.visualizer.visualizer import Visualizer
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    n = 500
+    frame = pd.DataFrame({
+        "date": pd.date_range("2024-01-01", periods=n, freq="h").astype(str),
+        "city": pd.Categorical(rng.choice(["Paris", "Tunis", "Rome"], n)),
+        "sales": rng.integers(0, 100, n),
+        "price": rng.normal(10, 2, n),
+    })
+    frame.loc[::50, "price"] = np.nan
+    return frame
+
+
+def make_executor(df):
+    strategies = {
+        "describe": DescribeStrategy(),
+        "groupby": GroupByStrategy(),
+        "correlation": CorrelationStrategy(),
+        "topk": TopKStrategy(),
+        "filter": FilterStrategy(),
+        "timeseries": TimeSeriesAggregateStrategy(),
+    }
+    return Executor(df, strategies, Visualizer(), result_cache=None)
+
+
+PLAN = {"actions": [
+    {"type": "compute", "name": "describe", "columns": ["sales", "price"]},
+    {"type": "compute", "name": "groupby", "by": "city", "agg": "mean", "target": "sales"},
+    {"type": "compute", "name": "correlation", "columns": ["sales", "price"]},
+    {"type": "compute", "name": "correlation", "target": "sales"},
+    {"type": "compute", "name": "topk", "column": "price", "k": 5},
+    {"type": "compute", "name": "filter", "column": "sales", "operator": ">", "value": 50},
+    {"type": "compute", "name": "timeseries", "date_column": "date", "value_column": "sales", "freq": "D"},
+    {"type": "visualize", "name": "histogram", "params": {"column": "price"}},
+    {"type": "visualize", "name": "boxplot", "params": {"column": "sales", "by": "city"}},
+    {"type": "visualize", "name": "timeseries", "params": {"date_column": "date", "value_column": "sales", "freq": "D"}},
+]}
+
+
+def test_execute_never_mutates_the_callers_frame(df):
+    before = df.copy(deep=True)
+    dtypes = df.dtypes.copy()
+
+    results = make_executor(df).execute(PLAN)
+
+    assert len(results) == len(PLAN["actions"])
+    assert not any(r["type"] == "error" for r in results)
+    assert not any(isinstance(r.get("value"), str) and r["value"].startswith("[ERROR]") for r in results)
+    pd.testing.assert_series_equal(df.dtypes, dtypes)
+    pd.testing.assert_frame_equal(df, before)
+
+
+def test_execute_leaves_pandas_options_alone(df):
+    previous = pd.get_option("mode.copy_on_write")
+    make_executor(df).execute({"actions": PLAN["actions"][:2]})
+    assert pd.get_option("mode.copy_on_write") == previous
+
+
+def test_heatmap_without_columns_is_only_drawn_from_a_full_matrix(df):
+    executor = make_executor(df)
+    heatmap = {"type": "visualize", "name": "heatmap"}
+    partial = {"type": "compute", "name": "correlation", "columns": ["sales"]}
+    full = {"type": "compute", "name": "correlation", "columns": ["sales", "price"]}
+    assert executor._result_source(1, heatmap, [partial]) is None
+    assert executor._result_source(2, heatmap, [full, partial]) == 0
@@ -0,0 +1,80 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.executor.strategies.filter import FilterStrategy
+from core.executor.strategies.groupby import GroupByStrategy
+from core.managers.ingestion import read_csv_optimized
+
+
+@pytest.fixture
+def csv(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 3000
+    # Each chunk meets the cities in a different order, so merged categories come unsorted
+    cities = np.array(["Tunis", "Paris", "Rome", "Berlin", "Oslo"])
+    frame = pd.DataFrame({
+        "city": np.concatenate([rng.choice(cities[i:], n // 3) for i in (3, 1, 0)]),
+        "units": rng.integers(0, 100, n),
+        "price": rng.integers(0, 1000, n) / 4,   # exact in float32
+        "ratio": rng.random(n),                   # not exact in float32
+        "day": pd.date_range("2024-01-01", periods=n, freq="h").strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    frame.loc[::97, "city"] = np.nan
+    path = tmp_path / "sales.csv"
+    frame.to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture
+def frames(csv):
+    optimized, _ = read_csv_optimized(csv, chunksize=1000)
+    return optimized, pd.read_csv(csv)
+
+
+def test_dtypes_are_compact_and_values_unchanged(frames):
+    optimized, plain = frames
+    city = optimized["city"].dtype
+    assert isinstance(city, pd.CategoricalDtype) and city.ordered
+    assert list(city.categories) == sorted(city.categories)
+    assert optimized["units"].dtype == np.int8
+    assert optimized["price"].dtype == np.float32
+    assert optimized["ratio"].dtype == np.float64
+    assert pd.api.types.is_datetime64_any_dtype(optimized["day"])
+
+    pd.testing.assert_series_equal(optimized["city"].astype(object), plain["city"])
+    np.testing.assert_array_equal(optimized["units"].to_numpy(), plain["units"].to_numpy())
+    np.testing.assert_array_equal(optimized["price"].to_numpy(np.float64), plain["price"].to_numpy())
+    np.testing.assert_array_equal(optimized["ratio"].to_numpy(), plain["ratio"].to_numpy())
+
+
+@pytest.mark.parametrize("operator,value", [(">", "a"), (">", "Paris"), ("<=", "Q"), ("==", "Rome"), ("!=", "Rome"), ("==", "Lima")])
+def test_filter_on_categoricals_matches_plain_strings(frames, operator, value):
+    optimized, plain = frames
+    params = {"column": "city", "operator": operator, "value": value}
+    result, expected = FilterStrategy().compute(optimized, params), FilterStrategy().compute(plain, params)
+    assert not isinstance(result, str), result
+    assert result["filtered_count"] == expected["filtered_count"]
+    assert [r["units"] for r in result["sample"]] == [r["units"] for r in expected["sample"]]
+
+
+@pytest.mark.parametrize("params", [
+    {"by": "city", "agg": "mean", "target": "units"},
+    {"by": "city", "agg": "sum"},
+    {"by": "city", "agg": "count"},
+])
+def test_groupby_on_categoricals_matches_plain_strings(frames, params):
+    optimized, plain = frames
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        result = GroupByStrategy().compute(optimized, params)
+    expected = GroupByStrategy().compute(plain, params)
+    assert not isinstance(result, str), result
+    # Sorted groups, none empty
+    assert [r["city"] for r in result] == [r["city"] for r in expected]
+    for got, want in zip(result, expected):
+        for key in ("units", "price"):
+            if key in want:
+                assert got[key] == pytest.approx(want[key])
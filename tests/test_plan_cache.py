@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from core.planner.plan_cache import PlanCache
+
+
+class ConstantEmbedding:
+    """Every question embeds to the same vector, so only the cache's own rules decide."""
+
+    def get_query_embedding(self, question):
+        return np.ones(8)
+
+
+COLUMNS = ["city", "sales", "date"]
+LONDON = {"actions": [
+    {"type": "compute", "name": "filter", "column": "city", "operator": "==", "value": "London"},
+    {"type": "compute", "name": "groupby", "by": "city", "agg": "sum", "target": "sales"},
+    {"type": "visualize", "name": "boxplot", "params": {"column": "sales", "by": "city"}},
+    {"type": "answer", "style": "short", "text": "London sold the most."},
+]}
+
+
+@pytest.fixture
+def cache():
+    cache = PlanCache(ConstantEmbedding(), threshold=0.9)
+    cache.store("Total sales in London", COLUMNS, LONDON)
+    return cache
+
+
+def test_literals_ignore_columns_and_planner_vocabulary():
+    assert PlanCache.literals(LONDON) == ("london",)
+
+
+@pytest.mark.parametrize("question", ["total sales in london", "What were total sales in LONDON?"])
+def test_hit_when_the_question_names_the_plans_entities(cache, question):
+    assert cache.lookup(question, COLUMNS) == LONDON
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("question", [
+    "Total sales in Paris",            # different entity
+    "Total sales in London over 50",   # extra number
+    "Lowest sales in London",          # different direction
+])
+def test_miss_when_questions_differ_in_what_embeddings_blur(cache, question):
+    assert cache.lookup(question, COLUMNS) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_miss_when_a_referenced_column_is_gone(cache):
+    assert cache.lookup("Total sales in London", ["sales", "date"]) is None
+
+
+def test_hit_picks_the_entry_for_the_named_entity(cache):
+    paris = {"actions": [{**LONDON["actions"][0], "value": "Paris"}]}
+    cache.store("Total sales in Paris", COLUMNS, paris)
+    assert cache.lookup("total sales for paris", COLUMNS) == paris
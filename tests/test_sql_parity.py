@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from core.executor.sql_source import DuckDBSource
+from core.executor.strategies.correlation import CorrelationStrategy
+from core.executor.strategies.describe import DescribeStrategy
+from core.executor.strategies.filter import FilterStrategy
+from core.executor.strategies.groupby import GroupByStrategy
+from core.executor.strategies.timeseries import TimeSeriesAggregateStrategy
+from core.executor.strategies.topk import TopKStrategy
+from core.managers.dataset_manager import DatasetManager
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    n = 2000
+    frame = pd.DataFrame({
+        "k": rng.integers(0, 5, n),                      # many ties
+        "v": rng.integers(0, 20, n).astype(float),
+        "w": rng.normal(0, 1, n),
+        "city": rng.choice(["Paris", "Rome", "Tunis"], n),
+        "day": pd.date_range("2024-01-01", periods=n, freq="h").strftime("%Y-%m-%d %H:%M:%S"),
+    })
+    frame.loc[::37, "v"] = np.nan
+    path = tmp_path_factory.mktemp("parity") / "data.csv"
+    frame.to_csv(path, index=False)
+
+    # Both backends read the same columnar sidecar, as in the app
+    manager = DatasetManager()
+    df = manager.load(path)
+    source = DuckDBSource(manager.ingest(path, manager.fingerprint))
+    yield df, source
+    source.close()
+
+
+def assert_same(pandas_result, sql_result):
+    if isinstance(pandas_result, str):
+        assert sql_result == pandas_result
+        return
+    left = pd.DataFrame(pandas_result) if not isinstance(pandas_result, dict) else pd.json_normalize(pandas_result)
+    right = pd.DataFrame(sql_result) if not isinstance(sql_result, dict) else pd.json_normalize(sql_result)
+    pd.testing.assert_frame_equal(left, right, check_dtype=False, check_like=True, rtol=1e-5)
+
+
+CASES = [
+    (FilterStrategy(), {"column": "k", "operator": "==", "value": 3}),
+    (FilterStrategy(), {"column": "k", "operator": "==", "value": "3"}),
+    (FilterStrategy(), {"column": "city", "operator": "==", "value": 3}),
+    (FilterStrategy(), {"column": "city", "operator": ">", "value": "Q"}),
+    (FilterStrategy(), {"column": "v", "operator": "<=", "value": 4}),
+    (TopKStrategy(), {"column": "k", "k": 7}),
+    (TopKStrategy(), {"column": "k", "k": 7, "ascending": True}),
+    (TopKStrategy(), {"column": "v", "k": 30}),
+    (GroupByStrategy(), {"by": "city", "agg": "mean", "target": "v"}),
+    (GroupByStrategy(), {"by": "city", "agg": "sum", "target": "k"}),
+    (GroupByStrategy(), {"by": "k", "agg": "max", "target": "w"}),
+    (CorrelationStrategy(), {"columns": ["k", "v", "w"]}),
+    (CorrelationStrategy(), {"target": "w", "top_n": 2}),
+    (TimeSeriesAggregateStrategy(), {"date_column": "day", "value_column": "v", "freq": "D"}),
+    (DescribeStrategy(), {"columns": ["k", "v", "w"]}),
+]
+
+
+@pytest.mark.parametrize("strategy,params", CASES, ids=[f"{type(s).__name__}-{i}" for i, (s, _) in enumerate(CASES)])
+def test_duckdb_matches_pandas(dataset, strategy, params):
+    df, source = dataset
+    try:
+        sql_result = strategy.compute_sql(source, params)
+    except NotImplementedError:
+        pytest.skip("no SQL translation")
+    assert_same(strategy.compute(df, params), sql_result)
+
+
+def test_filter_rejects_type_mismatches_in_both_backends(dataset):
+    df, source = dataset
+    params = {"column": "k", "operator": "==", "value": "3"}
+    assert FilterStrategy().compute(df, params).startswith("[ERROR]")
+    assert FilterStrategy().compute_sql(source, params) == FilterStrategy().compute(df, params)
@@ -0,0 +1,46 @@
+import pytest
+
+from core.visualizer.visualizer import Visualizer
+
+NUMERIC = ["sales", "price", "units"]
+MATRIX = {"type": "compute", "name": "correlation", "columns": ["sales", "price"]}
+FULL_MATRIX = {"type": "compute", "name": "correlation", "columns": ["city", *NUMERIC]}
+TARGET = {"type": "compute", "name": "correlation", "target": "sales"}
+GROUPBY = {"type": "compute", "name": "groupby", "by": "city", "agg": "mean", "target": "sales"}
+
+
+def heatmap(**params):
+    return {"type": "visualize", "name": "heatmap", "params": params}
+
+
+def barplot(**params):
+    return {"type": "visualize", "name": "barplot", "params": params}
+
+
+@pytest.mark.parametrize("step,compute,accepted", [
+    # A heatmap without columns covers every numeric column
+    (heatmap(), MATRIX, False),
+    (heatmap(columns=[]), MATRIX, False),
+    (heatmap(), FULL_MATRIX, True),
+    (heatmap(columns=["price", "sales"]), MATRIX, True),
+    (heatmap(columns=["sales", "units"]), MATRIX, False),
+    (heatmap(columns=["city", "sales", "price"]), MATRIX, True),
+    (heatmap(), TARGET, False),
+    ({"type": "visualize", "name": "boxplot", "params": {"column": "sales", "by": "city"}}, GROUPBY, False),
+    (barplot(x="city"), GROUPBY, False),
+    (barplot(x="city", y="sales"), GROUPBY, True),
+    (barplot(x="city", y="price"), GROUPBY, False),
+    (barplot(), GROUPBY, True),
+])
+def test_accepts_result(step, compute, accepted):
+    assert Visualizer().accepts_result(step, compute, numeric=NUMERIC) is accepted
+
+
+def test_heatmap_without_columns_needs_the_numeric_columns():
+    assert not Visualizer().accepts_result(heatmap(), FULL_MATRIX)
+
+
+def test_explicit_source_skips_parameter_matching():
+    visualizer = Visualizer()
+    assert visualizer.accepts_result(heatmap(), MATRIX, explicit=True)
+    assert not visualizer.accepts_result(heatmap(), TARGET, explicit=True)